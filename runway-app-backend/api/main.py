@@ -67,6 +67,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cursor for the next keyset page of /bank-transactions
+    expose_headers=["X-Next-Cursor"],
 )
 
 
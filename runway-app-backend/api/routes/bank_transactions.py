@@ -4,7 +4,7 @@ Bank Transaction API Routes
 CRUD operations for bank transactions (savings, current, checking accounts).
 """
 
-from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi import APIRouter, HTTPException, Query, Response, status, Depends
 from typing import List, Optional
 import sys
 from pathlib import Path
@@ -39,6 +39,7 @@ def get_bank_transaction_service(db: DatabaseManager = Depends(get_db)) -> BankT
 
 @router.get("/", response_model=List[dict])
 async def get_bank_transactions(
+    response: Response,
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(50, ge=1, le=1000, description="Items per page"),
     account_id: Optional[str] = Query(None, description="Filter by account ID"),
@@ -46,6 +47,8 @@ async def get_bank_transactions(
     end_date: Optional[str] = Query(None, description="Filter by end date (YYYY-MM-DD)"),
     category: Optional[str] = Query(None, description="Filter by category"),
     transaction_type: Optional[str] = Query(None, description="Filter by transaction type ('debit' or 'credit')"),
+    keyset: bool = Query(False, description="Use cursor pagination (next page cursor in X-Next-Cursor header)"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page's X-Next-Cursor header"),
     current_user: User = Depends(get_current_user),
     service: BankTransactionService = Depends(get_bank_transaction_service)
 ):
@@ -59,6 +62,8 @@ async def get_bank_transactions(
     - **end_date**: Filter transactions until this date (YYYY-MM-DD)
     - **category**: Filter by category
     - **transaction_type**: Filter by transaction type ('debit' or 'credit')
+    - **keyset**: Page by cursor instead of page number; stays fast on deep pages
+    - **cursor**: Continue after the page that returned this cursor (implies keyset)
     """
     try:
         # Calculate offset
@@ -73,11 +78,23 @@ async def get_bank_transactions(
             category=category,
             transaction_type=transaction_type,
             limit=page_size,
-            offset=offset
+            offset=offset,
+            keyset=keyset,
+            cursor=cursor
         )
         
+        if keyset or cursor:
+            next_cursor = service.next_cursor(transactions, page_size)
+            if next_cursor:
+                response.headers['X-Next-Cursor'] = next_cursor
+        
         return transactions
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Error getting bank transactions: {e}", exc_info=True)
         raise HTTPException(
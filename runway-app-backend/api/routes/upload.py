@@ -111,8 +111,9 @@ async def upload_csv(file: UploadFile = File(...)):
         logger.info(f"Deduplication: {len(transactions)} → {len(clean_transactions)} "
                    f"({duplicate_stats['merged_count']} duplicates merged)")
 
-        # Convert to canonical schema
+        # Convert to canonical schema (one ingestion timestamp per upload)
         canonical_txns = []
+        ingestion_ts = datetime.now().isoformat()
         for txn in clean_transactions:
             try:
                 canonical = CanonicalTransaction(
@@ -129,7 +130,8 @@ async def upload_csv(file: UploadFile = File(...)):
                     balance=float(txn.get('balance')) if txn.get('balance') is not None else None,
                     source='csv_upload',
                     is_duplicate=txn.get('is_duplicate', False),
-                    duplicate_count=txn.get('duplicate_count', 0)
+                    duplicate_count=txn.get('duplicate_count', 0),
+                    ingestion_timestamp=ingestion_ts
                 )
                 canonical_txns.append(canonical)
             except Exception as e:
@@ -35,6 +35,11 @@ class Config:
     # Database
     DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///data/finance.db')
 
+    # Cache (optional Redis; caching is disabled when unset)
+    REDIS_URL = os.getenv('REDIS_URL')
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '0.5'))
+    CC_SUMMARY_CACHE_TTL = int(os.getenv('CC_SUMMARY_CACHE_TTL', '3600'))
+
     # API Keys (optional - for future cloud integrations)
     AWS_ACCESS_KEY_ID = os.getenv('AWS_ACCESS_KEY_ID')
     AWS_SECRET_ACCESS_KEY = os.getenv('AWS_SECRET_ACCESS_KEY')
@@ -52,10 +52,12 @@ class Normalizer:
 
         canonical_txns = []
         errors = []
+        # One ingestion timestamp for the whole batch
+        ingestion_ts = datetime.now().isoformat()
 
         for idx, raw_txn in enumerate(raw_transactions):
             try:
-                canonical = self._normalize_single(raw_txn)
+                canonical = self._normalize_single(raw_txn, ingestion_ts)
                 canonical_txns.append(canonical)
             except Exception as e:
                 errors.append(f"Transaction {idx}: {e}")
@@ -69,12 +71,14 @@ class Normalizer:
         logger.info(f"Normalized {len(canonical_txns)}/{len(raw_transactions)} transactions")
         return canonical_txns
 
-    def _normalize_single(self, raw_txn: Dict) -> CanonicalTransaction:
+    def _normalize_single(self, raw_txn: Dict,
+                          ingestion_timestamp: Optional[str] = None) -> CanonicalTransaction:
         """
         Normalize a single transaction
 
         Args:
             raw_txn: Raw transaction dictionary
+            ingestion_timestamp: Batch ingestion timestamp (defaults to now)
 
         Returns:
             CanonicalTransaction object
@@ -132,6 +136,7 @@ class Normalizer:
             balance=balance,
             source=self.source,
             bank_name=self.bank_name,
+            ingestion_timestamp=ingestion_timestamp,
             metadata=metadata,
         )
 
@@ -1,33 +1,106 @@
 """
 ML Transaction Categorizer
 
-Uses TF-IDF + Random Forest for transaction categorization.
+Uses hashed TF-IDF features + Random Forest for transaction categorization.
 Supports incremental learning from user corrections.
 """
 
 import joblib
 import logging
 import json
+import re
+import warnings
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 import numpy as np
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer, TfidfTransformer
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV
+from sklearn.pipeline import Pipeline, make_pipeline
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV, cross_val_score
 from sklearn.metrics import classification_report, accuracy_score
 from sklearn.utils.class_weight import compute_class_weight
 
+try:
+    import lz4  # noqa: F401
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+try:
+    import onnxruntime
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# lz4 keeps the pickle small at near-memcpy decompression speed; without it the
+# model is stored uncompressed so load_model can memory-map its arrays instead
+MODEL_COMPRESSION = ('lz4', 3) if LZ4_AVAILABLE else 0
+
+# ONNX tree ensembles take dense input; densify this many rows at a time
+ONNX_BATCH_ROWS = 1024
+
+
+# Hashed feature space: no vocabulary to store or consult at predict time
+HASH_N_FEATURES = 2 ** 13
+
+# Random forest settings; per-tree subsampling and pruning keep trees shallow
+RF_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 20,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'max_features': 'sqrt',
+    'bootstrap': True,
+    'max_samples': 0.632,
+    'min_impurity_decrease': 1e-4,
+    'ccp_alpha': 1e-4,
+}
+
+# Tokenizer compiled once at import (same pattern as scikit-learn's default)
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+STOP_WORDS = frozenset(ENGLISH_STOP_WORDS)
+
+# Number of hash buckets (by importance) whose source terms are kept for reporting
+FEATURE_NAME_LOG_SIZE = 100
+
+# Transaction fields to read, in priority order
+MERCHANT_KEYS = ('merchant_canonical', 'merchant_raw')
+DESCRIPTION_KEYS = ('clean_description', 'description')
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split lowercased text into word tokens, dropping English stop words"""
+    return [token for token in TOKEN_PATTERN.findall(text) if token not in STOP_WORDS]
+
+
+def _first_nonempty(txn: Dict, keys: Tuple[str, ...]) -> str:
+    """Return the first truthy value among keys (one lookup when the first key hits)"""
+    for key in keys:
+        value = txn.get(key)
+        if value:
+            return value
+    return ''
+
+
+def _join_pairs(merchants: List[str], descriptions: List[str], empty: str = '') -> List[str]:
+    """Combine merchant and description into model input text, one per transaction"""
+    return [f"{m} {d}".strip() or empty for m, d in zip(merchants, descriptions)]
+
 
 class MLCategorizer:
     """
     ML-based transaction categorizer
 
     Features:
-    - TF-IDF feature extraction from merchant names and descriptions
+    - Hashed TF-IDF feature extraction from merchant names and descriptions
     - Random Forest classifier with hyperparameter tuning
     - Stratified cross-validation
     - Class weight balancing for imbalanced datasets
@@ -46,9 +119,16 @@ class MLCategorizer:
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
 
         # ML components
-        self.vectorizer: Optional[TfidfVectorizer] = None
+        self.vectorizer: Optional[Pipeline] = None
         self.classifier: Optional[RandomForestClassifier] = None
 
+        # Hash bucket -> source term, for the most important buckets only
+        self.feature_names: Dict[int, str] = {}
+
+        # Optional ONNX export of the classifier (fast CPU inference path)
+        self.onnx_model: Optional[bytes] = None
+        self._onnx_session = None
+
         # Model metadata
         self.metadata = {
             'version': '1.0',
@@ -85,16 +165,16 @@ class MLCategorizer:
 
         logger.info(f"Training categorizer on {len(transactions)} transactions...")
 
-        # Prepare features and labels
+        # Prepare features and labels (merchant + description for richer features)
+        texts = _join_pairs(
+            [_first_nonempty(txn, MERCHANT_KEYS) for txn in transactions],
+            [_first_nonempty(txn, DESCRIPTION_KEYS) for txn in transactions]
+        )
+
         X_text = []
         y = []
 
-        for txn in transactions:
-            # Combine merchant and description for richer features
-            merchant = txn.get('merchant_canonical') or txn.get('merchant_raw') or ''
-            description = txn.get('clean_description') or txn.get('description') or ''
-            text = f"{merchant} {description}".strip()
-
+        for text, txn in zip(texts, transactions):
             category = txn.get('category')
 
             if not text or not category:
@@ -110,17 +190,6 @@ class MLCategorizer:
         unique_categories = sorted(list(set(y)))
         logger.info(f"Categories: {unique_categories}")
 
-        # Initialize vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),
-            min_df=2,
-            stop_words='english'
-        )
-
-        # Transform text to features
-        X = self.vectorizer.fit_transform(X_text)
-
         # Compute class weights for imbalanced datasets
         class_weights = compute_class_weight(
             class_weight='balanced',
@@ -130,66 +199,63 @@ class MLCategorizer:
         class_weight_dict = dict(zip(unique_categories, class_weights))
         logger.info(f"Class weights: {class_weight_dict}")
 
-        # Initialize classifier
-        if tune_hyperparameters:
-            logger.info("Performing hyperparameter tuning...")
-            self.classifier = self._tune_hyperparameters(X, y, unique_categories, class_weight_dict)
-        else:
-            self.classifier = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=20,
-                min_samples_split=5,
-                min_samples_leaf=2,
+        # Vectorizer + classifier as one estimator, so CV folds re-fit the
+        # TF-IDF weights on their own training split (no validation leakage)
+        pipe = Pipeline([
+            ('tfidf', self._build_vectorizer()),
+            ('clf', RandomForestClassifier(
                 class_weight=class_weight_dict,
                 random_state=42,
-                n_jobs=-1
-            )
+                n_jobs=-1,
+                **RF_PARAMS
+            )),
+        ])
+
+        if tune_hyperparameters:
+            logger.info("Performing hyperparameter tuning...")
+            pipe = self._tune_hyperparameters(pipe, X_text, y)
 
         # Train/test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=42, stratify=y
+        X_train_text, X_test_text, y_train, y_test = train_test_split(
+            X_text, y, test_size=test_size, random_state=42, stratify=y
         )
 
-        # Train model
-        self.classifier.fit(X_train, y_train)
-
-        # Evaluate
-        y_pred = self.classifier.predict(X_test)
-        accuracy = accuracy_score(y_test, y_pred)
-
-        logger.info(f"Test accuracy: {accuracy:.3f}")
-
-        # Cross-validation
+        # Cross-validation on clones of the same pipeline (folds run in parallel)
         cv_scores = []
         if use_cross_validation and len(X_text) >= n_folds * 2:
             logger.info(f"Running {n_folds}-fold cross-validation...")
             cv = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+            cv_pipe = clone(pipe).set_params(clf__n_jobs=1)
 
-            for fold, (train_idx, val_idx) in enumerate(cv.split(X, y), 1):
-                X_fold_train = X[train_idx]
-                X_fold_val = X[val_idx]
-                y_fold_train = [y[i] for i in train_idx]
-                y_fold_val = [y[i] for i in val_idx]
-
-                fold_clf = RandomForestClassifier(
-                    n_estimators=100,
-                    max_depth=20,
-                    class_weight=class_weight_dict,
-                    random_state=42,
-                    n_jobs=-1
-                )
-                fold_clf.fit(X_fold_train, y_fold_train)
-                fold_score = fold_clf.score(X_fold_val, y_fold_val)
-                cv_scores.append(fold_score)
+            cv_scores = [float(score) for score in cross_val_score(cv_pipe, X_text, y, cv=cv, n_jobs=-1)]
+            for fold, fold_score in enumerate(cv_scores, 1):
                 logger.info(f"  Fold {fold}: {fold_score:.3f}")
 
             mean_cv_score = np.mean(cv_scores)
             logger.info(f"Mean CV accuracy: {mean_cv_score:.3f} ± {np.std(cv_scores):.3f}")
 
+        # Train model
+        self.vectorizer = pipe.named_steps['tfidf']
+        self.classifier = pipe.named_steps['clf']
+
+        X = self.vectorizer.fit_transform(X_train_text)
+        self.classifier.fit(X, y_train)
+
+        # Evaluate
+        y_pred = self.classifier.predict(self.vectorizer.transform(X_test_text))
+        accuracy = accuracy_score(y_test, y_pred)
+
+        logger.info(f"Test accuracy: {accuracy:.3f}")
+
+        self.onnx_model = self._export_onnx(X.shape[1])
+        self._onnx_session = None
+
         # Classification report
         report = classification_report(y_test, y_pred)
         logger.info(f"\nClassification Report:\n{report}")
 
+        self.feature_names = self._log_feature_names(X_text)
+
         # Update metadata
         self.metadata = {
             'version': '2.0',
@@ -199,8 +265,12 @@ class MLCategorizer:
             'accuracy': accuracy,
             'cv_scores': cv_scores,
             'mean_cv_score': np.mean(cv_scores) if cv_scores else None,
-            'vocab_size': len(self.vectorizer.vocabulary_),
+            'vocab_size': int(np.count_nonzero(X.getnnz(axis=0))),
             'class_weights': class_weight_dict,
+            'hyperparameters': {
+                name: value for name, value in self.classifier.get_params().items()
+                if name in RF_PARAMS
+            },
         }
 
         # Save model
@@ -214,23 +284,100 @@ class MLCategorizer:
             'categories': unique_categories,
         }
 
-    def _tune_hyperparameters(self, X, y, categories, class_weight_dict) -> RandomForestClassifier:
+    def _log_feature_names(self, X_text: List[str]) -> Dict[int, str]:
+        """Map the top hash buckets (by importance) back to training terms"""
+        hashing = self.vectorizer.steps[0][1]
+        analyzer = hashing.build_analyzer()
+        terms = sorted({term for text in X_text for term in analyzer(text)})
+        if not terms:
+            return {}
+
+        # Same hashing scheme as HashingVectorizer, one term per row
+        hasher = FeatureHasher(
+            n_features=hashing.n_features,
+            input_type='string',
+            alternate_sign=False
+        )
+        indices = hasher.transform([[term] for term in terms]).indices
+
+        top = set(np.argsort(self.classifier.feature_importances_)[::-1][:FEATURE_NAME_LOG_SIZE])
+
+        feature_names = {}
+        for term, index in zip(terms, indices):
+            index = int(index)
+            if index in top:
+                feature_names.setdefault(index, term)
+        return feature_names
+
+    def _export_onnx(self, n_features: int) -> Optional[bytes]:
+        """Convert the fitted classifier to ONNX (None if unavailable or unsupported)"""
+        if not ONNX_AVAILABLE:
+            return None
+
+        try:
+            onx = convert_sklearn(
+                self.classifier,
+                initial_types=[('features', FloatTensorType([None, n_features]))],
+                options={id(self.classifier): {'zipmap': False}}
+            )
+            return onx.SerializeToString()
+        except Exception as e:
+            logger.warning(f"ONNX export failed, using scikit-learn for inference: {e}")
+            return None
+
+    def _get_onnx_session(self):
+        """Lazily create the ONNX Runtime session for the exported classifier"""
+        if self._onnx_session is None and self.onnx_model and ONNX_AVAILABLE:
+            self._onnx_session = onnxruntime.InferenceSession(
+                self.onnx_model, providers=['CPUExecutionProvider']
+            )
+        return self._onnx_session
+
+    def _predict_features(self, X) -> Tuple[np.ndarray, np.ndarray]:
+        """Predict (categories, confidences) for a feature matrix"""
+        session = self._get_onnx_session()
+
+        if session is None:
+            probabilities = self.classifier.predict_proba(X)
+            best = np.argmax(probabilities, axis=1)
+            return self.classifier.classes_[best], probabilities[np.arange(len(best)), best]
+
+        categories = []
+        confidences = []
+        for start in range(0, X.shape[0], ONNX_BATCH_ROWS):
+            dense = X[start:start + ONNX_BATCH_ROWS].toarray().astype(np.float32, copy=False)
+            labels, probabilities = session.run(None, {'features': dense})
+            categories.append(labels)
+            confidences.append(np.max(probabilities, axis=1))
+
+        return np.concatenate(categories), np.concatenate(confidences).astype(np.float64)
+
+    @staticmethod
+    def _build_vectorizer() -> Pipeline:
+        """Hashed TF-IDF vectorizer (hashing avoids a vocabulary dict on the serving path)"""
+        return make_pipeline(
+            HashingVectorizer(
+                n_features=HASH_N_FEATURES,
+                ngram_range=(1, 2),
+                tokenizer=_tokenize,
+                token_pattern=None,
+                alternate_sign=False,
+                norm=None
+            ),
+            TfidfTransformer(sublinear_tf=True)
+        )
+
+    def _tune_hyperparameters(self, pipe: Pipeline, X_text: List[str], y: List[str]) -> Pipeline:
         """Perform grid search for hyperparameter tuning"""
         param_grid = {
-            'n_estimators': [50, 100, 200],
-            'max_depth': [10, 20, 30],
-            'min_samples_split': [2, 5, 10],
-            'min_samples_leaf': [1, 2, 4],
+            'clf__n_estimators': [50, 100, 200],
+            'clf__max_depth': [10, 20, 30],
+            'clf__min_samples_split': [2, 5, 10],
+            'clf__min_samples_leaf': [1, 2, 4],
         }
 
-        base_clf = RandomForestClassifier(
-            class_weight=class_weight_dict,
-            random_state=42,
-            n_jobs=-1
-        )
-
         grid_search = GridSearchCV(
-            base_clf,
+            clone(pipe).set_params(clf__n_jobs=1),
             param_grid,
             cv=3,
             scoring='accuracy',
@@ -238,12 +385,12 @@ class MLCategorizer:
             verbose=1
         )
 
-        grid_search.fit(X, y)
+        grid_search.fit(X_text, y)
 
         logger.info(f"Best parameters: {grid_search.best_params_}")
         logger.info(f"Best CV score: {grid_search.best_score_:.3f}")
 
-        return grid_search.best_estimator_
+        return clone(pipe).set_params(**grid_search.best_params_)
 
     def predict(self, transaction: Dict) -> Tuple[str, float]:
         """
@@ -259,8 +406,8 @@ class MLCategorizer:
             raise ValueError("Model not trained. Call train() first or load_model()")
 
         # Extract text features
-        merchant = transaction.get('merchant_canonical') or transaction.get('merchant_raw') or ''
-        description = transaction.get('clean_description') or transaction.get('description') or ''
+        merchant = _first_nonempty(transaction, MERCHANT_KEYS)
+        description = _first_nonempty(transaction, DESCRIPTION_KEYS)
         text = f"{merchant} {description}".strip()
 
         if not text:
@@ -269,14 +416,10 @@ class MLCategorizer:
         # Transform to features
         X = self.vectorizer.transform([text])
 
-        # Predict
-        category = self.classifier.predict(X)[0]
+        # Predict category and confidence (probability) in one pass
+        categories, confidences = self._predict_features(X)
 
-        # Get confidence (probability)
-        probabilities = self.classifier.predict_proba(X)[0]
-        confidence = float(np.max(probabilities))
-
-        return category, confidence
+        return categories[0], float(confidences[0])
 
     def predict_batch(self, transactions: List[Dict]) -> List[Tuple[str, float]]:
         """
@@ -291,23 +434,20 @@ class MLCategorizer:
         if not self.vectorizer or not self.classifier:
             raise ValueError("Model not trained. Call train() first or load_model()")
 
-        # Extract text features
-        X_text = []
-        for txn in transactions:
-            merchant = txn.get('merchant_canonical') or txn.get('merchant_raw') or ''
-            description = txn.get('clean_description') or txn.get('description') or ''
-            text = f"{merchant} {description}".strip()
-            X_text.append(text if text else ' ')  # Avoid empty strings
+        # Extract text features (' ' avoids empty strings)
+        X_text = _join_pairs(
+            [_first_nonempty(txn, MERCHANT_KEYS) for txn in transactions],
+            [_first_nonempty(txn, DESCRIPTION_KEYS) for txn in transactions],
+            empty=' '
+        )
 
         # Transform to features
         X = self.vectorizer.transform(X_text)
 
-        # Predict
-        categories = self.classifier.predict(X)
-        probabilities = self.classifier.predict_proba(X)
-        confidences = np.max(probabilities, axis=1)
+        # Predict (plain floats, like predict())
+        categories, confidences = self._predict_features(X)
 
-        return list(zip(categories, confidences))
+        return list(zip(categories.tolist(), confidences.tolist()))
 
     def save_model(self):
         """Save trained model to disk"""
@@ -318,10 +458,12 @@ class MLCategorizer:
         model_data = {
             'vectorizer': self.vectorizer,
             'classifier': self.classifier,
+            'feature_names': self.feature_names,
+            'onnx_model': self.onnx_model,
             'metadata': self.metadata,
         }
 
-        joblib.dump(model_data, self.model_path)
+        joblib.dump(model_data, self.model_path, compress=MODEL_COMPRESSION, protocol=5)
         logger.info(f"Saved model to {self.model_path}")
 
         # Save metadata separately for easy access
@@ -348,10 +490,17 @@ class MLCategorizer:
             return False
 
         try:
-            model_data = joblib.load(self.model_path)
+            # Arrays are only read at predict time, so they can stay memory-mapped.
+            # Compressed models cannot be mapped and are loaded into memory instead.
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message='.*not compatible with compressed file.*')
+                model_data = joblib.load(self.model_path, mmap_mode='r')
 
             self.vectorizer = model_data['vectorizer']
             self.classifier = model_data['classifier']
+            self.feature_names = model_data.get('feature_names', {})
+            self.onnx_model = model_data.get('onnx_model')
+            self._onnx_session = None
             self.metadata = model_data.get('metadata', {})
 
             logger.info(f"Loaded model from {self.model_path}")
@@ -371,20 +520,20 @@ class MLCategorizer:
             top_n: Number of top features to return
 
         Returns:
-            Dictionary of feature names and their importance scores
+            Dictionary of feature names and their importance scores.
+            Hash buckets without a logged training term are named 'hash_<index>'.
         """
         if not self.classifier or not self.vectorizer:
             return {}
 
         # Get feature importances
         importances = self.classifier.feature_importances_
-        feature_names = self.vectorizer.get_feature_names_out()
 
         # Sort by importance
         indices = np.argsort(importances)[::-1][:top_n]
 
         return {
-            feature_names[i]: float(importances[i])
+            self.feature_names.get(int(i), f"hash_{i}"): float(importances[i])
             for i in indices
         }
 
@@ -13,7 +13,20 @@ import json
 import argparse
 from pathlib import Path
 from datetime import datetime
-import random
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Write buffer for JSONL output (1 MiB)
+WRITE_BUFFER_SIZE = 1 << 20
 
 
 # Comprehensive merchant mappings by category
@@ -206,60 +219,73 @@ DESCRIPTIONS_BY_CATEGORY = {
 }
 
 
-def generate_training_samples(category: str, count: int) -> list:
-    """Generate training samples for a category"""
+def _sample_category_frame(category: str, count: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Sample merchant/description pairs for a category in one vectorized draw"""
     merchants = MERCHANTS_BY_CATEGORY.get(category, [])
     descriptions = DESCRIPTIONS_BY_CATEGORY.get(category, [])
-    
-    if not merchants or not descriptions:
-        return []
-    
-    samples = []
-    for i in range(count):
-        merchant = random.choice(merchants)
-        description = random.choice(descriptions)
-        
-        # Add variety: sometimes use merchant only, sometimes combine
-        if random.random() < 0.7:
-            text = merchant
-        else:
-            text = f"{merchant} {description}"
-        
-        samples.append({
-            'merchant_canonical': merchant,
-            'description': description,
-            'category': category
-        })
-    
-    return samples
 
+    if not merchants or not descriptions or count <= 0:
+        return pd.DataFrame(columns=['merchant_canonical', 'description', 'category'])
+
+    m_idx = rng.integers(0, len(merchants), size=count)
+    d_idx = rng.integers(0, len(descriptions), size=count)
+
+    return pd.DataFrame({
+        'merchant_canonical': np.array(merchants, dtype=object)[m_idx],
+        'description': np.array(descriptions, dtype=object)[d_idx],
+        'category': category
+    })
+
+
+def generate_training_samples(category: str, count: int, seed: Optional[int] = None) -> list:
+    """Generate training samples for a category"""
+    rng = np.random.default_rng(seed)
+    return _sample_category_frame(category, count, rng).to_dict('records')
+
+
+def create_training_dataset(samples_per_category: int = 50,
+                            seed: Optional[int] = None,
+                            n_jobs: int = -1):
+    """Create comprehensive training dataset (categories are sampled in parallel)"""
+    categories = list(MERCHANTS_BY_CATEGORY.keys())
+
+    # One independent child seed per category keeps parallel runs reproducible
+    seed_seq = np.random.SeedSequence(seed)
+    child_seeds = seed_seq.spawn(len(categories) + 1)
+
+    frames = Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(_sample_category_frame)(category, samples_per_category, np.random.default_rng(child_seed))
+        for category, child_seed in zip(categories, child_seeds)
+    )
+
+    for category, category_frame in zip(categories, frames):
+        print(f"Generated {len(category_frame)} samples for {category}")
+
+    # Concatenate once, then shuffle for randomness
+    rng = np.random.default_rng(child_seeds[-1])
+    dataset = pd.concat(frames, ignore_index=True)
+    dataset = dataset.iloc[rng.permutation(len(dataset))]
+    all_samples = dataset.to_dict('records')
 
-def create_training_dataset(samples_per_category: int = 50):
-    """Create comprehensive training dataset"""
-    all_samples = []
-    
-    for category in MERCHANTS_BY_CATEGORY.keys():
-        category_samples = generate_training_samples(category, samples_per_category)
-        all_samples.extend(category_samples)
-        print(f"Generated {len(category_samples)} samples for {category}")
-    
-    # Shuffle for randomness
-    random.shuffle(all_samples)
-    
     print(f"\nTotal samples generated: {len(all_samples)}")
     print(f"Categories: {len(MERCHANTS_BY_CATEGORY)}")
     print(f"Average per category: {len(all_samples) // len(MERCHANTS_BY_CATEGORY)}")
-    
+
     return all_samples
 
 
 def save_training_data(samples: list, output_file: Path):
     """Save training data to JSONL file"""
     output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, 'w') as f:
-        for sample in samples:
-            f.write(json.dumps(sample) + '\n')
+
+    if ORJSON_AVAILABLE:
+        with open(output_file, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(b'\n'.join(orjson.dumps(sample) for sample in samples))
+            if samples:
+                f.write(b'\n')
+    else:
+        with open(output_file, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            f.writelines(json.dumps(sample) + '\n' for sample in samples)
     
     print(f"\nSaved to: {output_file}")
 
@@ -269,11 +295,15 @@ def load_existing_data(file_path: Path) -> list:
     if not file_path.exists():
         return []
     
+    loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
     samples = []
-    with open(file_path, 'r') as f:
+    with open(file_path, 'rb') as f:
         for line in f:
-            samples.append(json.loads(line.strip()))
-    
+            line = line.strip()
+            if line:
+                samples.append(loads(line))
+
     return samples
 
 
@@ -293,6 +323,18 @@ def main():
         default='ml/training_data/labeled_transactions.jsonl',
         help='Output file path'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=-1,
+        help='Parallel workers for sampling categories (default: -1, all cores)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Random seed for reproducible datasets'
+    )
     parser.add_argument(
         '--append',
         action='store_true',
@@ -311,7 +353,11 @@ def main():
     
     # Generate new samples
     print(f"\nGenerating {args.samples_per_category} samples per category...")
-    new_samples = create_training_dataset(args.samples_per_category)
+    new_samples = create_training_dataset(
+        args.samples_per_category,
+        seed=args.seed,
+        n_jobs=args.jobs
+    )
     
     # Combine with existing if appending
     if args.append:
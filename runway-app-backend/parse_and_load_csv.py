@@ -3,18 +3,31 @@
 Parse CSV file and load data into the database with proper categorization
 """
 
+import functools
+import re
 import sys
-import uuid
 from pathlib import Path
 from datetime import datetime
+import numpy as np
 import pandas as pd
 import logging
+from sqlalchemy import insert
 
 sys.path.insert(0, str(Path(__file__).parent))
 
 from storage.database import DatabaseManager
-from storage.models import Transaction, Asset, User
+from storage.models import (
+    BankTransaction, Asset, User,
+    TransactionType, TransactionSource, TransactionCategory
+)
 from config import Config
+from utils.ids import gen_uuids
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -44,131 +57,252 @@ def format_month(date_str):
         return ""
 
 
+# Date layouts seen in statement exports, tried in order. ISO-style dates
+# (Y-m-d, Y/m/d) are year-first; slash and dash dates are day-first.
+_MONTH_DATE_FORMATS = ['ISO8601', '%d/%m/%Y', '%d/%m/%y', '%d-%m-%Y', '%d-%m-%y']
+
+
+def format_months(dates):
+    """Extract YYYY-MM from a Series of date strings in one vectorized pass per layout"""
+    dates = pd.Series(dates, dtype=object).astype(str).str.strip()
+    months = pd.Series(np.nan, index=dates.index, dtype=object)
+    for fmt in _MONTH_DATE_FORMATS:
+        unparsed = months.isna()
+        if not unparsed.any():
+            break
+        parsed = pd.to_datetime(dates[unparsed], format=fmt, errors='coerce')
+        months[unparsed] = parsed.dt.strftime('%Y-%m')
+    # Only dates in none of the layouts fall back to the scalar formatter
+    unparsed = months.isna()
+    if unparsed.any():
+        months[unparsed] = dates[unparsed].map(format_month)
+    return months.fillna('')
+
+
+# Description-only keyword rules, in priority order: (keywords, type, category)
+# The first rule with any keyword contained in the description wins.
+INCOME_RULE = (
+    ['capital one', 'credited', 'neft', 'nft', 'salary credited',
+     'payment from', 'received', 'self transfer in', 'imt', 'ift',
+     'sweep from', 'rev sweep', 'cms/', 'inf/inft'],
+    'income', 'Income'
+)
+
+CATEGORY_RULES = [
+    (['sip', 'sipg', 'mutual fund', 'investment', 'apy_', 'fortune'], 'investment', 'Investment'),
+    (['insurance', 'premium', 'sbi life', 'life insurance', 'lic'], 'expense', 'Insurance'),
+    (['swiggy', 'zomato', 'uber eats', 'food', 'restaurant'], 'expense', 'Food & Dining'),
+    (['nfs/cash', 'cash wdl', 'atm', 'cash withdrawal'], 'expense', 'Cash Withdrawal'),
+    (['fastag', 'toll', 'fuel', 'petrol', 'hp pay', 'indianoil'], 'expense', 'Transport'),
+    (['medical', 'pharmacy', 'apollo', 'hospital'], 'expense', 'Medical'),
+    (['grocery', 'bigbasket', 'dmart'], 'expense', 'Groceries'),
+    (['amazon', 'flipkart', 'myntra', 'ajio', 'nykaa', 'meesho'], 'expense', 'Shopping'),
+    (['netflix', 'spotify', 'disney', 'prime', 'youtube premium', 'subscription'], 'expense', 'Subscriptions'),
+    (['charges', 'fee', 'penalty', 'service charge', 'gst'], 'expense', 'Banking & Fees'),
+    (['electricity', 'water', 'broadband', 'internet', 'wifi', 'spectra', 'act', 'reliance jio'], 'expense', 'Utilities'),
+    (['rent', 'rental', 'housing', 'accommodation'], 'expense', 'Rent'),
+    (['school', 'college', 'education', 'tuition', 'course'], 'expense', 'Education'),
+    (['cashback', 'reward', 'discount', 'vouchers'], 'income', 'Rewards & Cashback'),
+]
+
+_KEYWORD_RULES = [INCOME_RULE] + CATEGORY_RULES
+
+_CATEGORY_BY_VALUE = {category.value: category for category in TransactionCategory}
+
+# EMI/Loan detection for Indian banks and NBFCs
+# Major Indian Banks (public sector)
+PUBLIC_BANKS = frozenset({'state bank', 'sbi', 'bank of baroda', 'canara bank', 'union bank',
+                          'indian bank', 'pnb', 'punjab national', 'bank of india', 'central bank',
+                          'oriental bank', 'obc', 'uco bank', 'iob', 'indian overseas'})
+
+# Private banks
+PRIVATE_BANKS = frozenset({'hdfc', 'icici', 'axis bank', 'kotak',
+                           'indusind', 'yes bank', 'idfc', 'federal bank', 'rbl'})
+
+# HFCs (Housing Finance Companies)
+HFCS = frozenset({'canfin', 'canfinhomes', 'lic housing', 'dhfl', 'dewan housing',
+                  'repco home', 'adani capital', 'poonawalla'})
+
+# NBFCs
+NBFCS = frozenset({'bajaj', 'tata capital', 'tata finance',
+                   'mahindra finance', 'shriram', 'muthoot', 'manappuram', 'cholamandalam',
+                   'sundaram finance', 'fullerton'})
+
+# Names are matched as substrings: statements glue them to other text
+# ('EMIHDFC', 'NACH/BAJAJFIN/EMI', 'ICICIBANK EMI')
+ALL_FINANCIAL = PUBLIC_BANKS | PRIVATE_BANKS | HFCS | NBFCS
+
+EMI_KEYWORDS = ['emi', 'loan', 'personal loan', 'installment', 'repayment', 'principal']
+HOME_LOAN_KEYWORDS = ['home', 'housing', 'mortgage', 'canfin']
+
+
+def _union_pattern(keywords):
+    """Compile a keyword list into one substring-matching alternation"""
+    return re.compile('|'.join(re.escape(k) for k in keywords))
+
+
+# Precompiled keyword unions: one regex scan per check instead of a Python
+# loop of `in` tests (shared by the scalar and column-wise paths)
+_INCOME_RE = _union_pattern(INCOME_RULE[0])
+_FINANCIAL_RE = _union_pattern(sorted(ALL_FINANCIAL))
+_EMI_KW_RE = _union_pattern(EMI_KEYWORDS)
+_HOME_LOAN_RE = _union_pattern(HOME_LOAN_KEYWORDS)
+_CATEGORY_RULE_RES = [_union_pattern(keywords) for keywords, _, _ in CATEGORY_RULES]
+
+# One pattern for all rules: a zero-width lookahead at every position with one
+# named group per rule, tried in priority order. Across all positions, the
+# lowest-numbered group that matched is the highest-priority rule present.
+_KEYWORD_RULES_RE = re.compile(
+    '(?=' + '|'.join(
+        f"(?P<r{i}>{'|'.join(re.escape(k) for k in keywords)})"
+        for i, (keywords, _, _) in enumerate(_KEYWORD_RULES)
+    ) + ')'
+)
+
+
+def _match_keyword_rule(desc_lower):
+    """Return the index of the highest-priority keyword rule matching desc_lower, or None"""
+    best = None
+    for match in _KEYWORD_RULES_RE.finditer(desc_lower):
+        rule = int(match.lastgroup[1:])
+        if best is None or rule < best:
+            best = rule
+            if best == 0:
+                break
+    return best
+
+
+@functools.lru_cache(maxsize=8192)
+def _description_features(desc_lower):
+    """
+    Amount-independent keyword checks for a lowercased description
+
+    Statements repeat the same merchant strings heavily, so results are
+    memoized; only the amount thresholds are evaluated per call.
+
+    Returns:
+        Tuple of (keyword_rule, has_credit, is_financial, has_emi_keyword,
+        is_home_loan, is_personal)
+    """
+    return (
+        # Single scan over all description keyword rules
+        _match_keyword_rule(desc_lower),
+        'credit' in desc_lower,
+        # Check if transaction involves any bank/HFC/NBFC (likely EMI if debit)
+        _FINANCIAL_RE.search(desc_lower) is not None,
+        # Check for EMI keywords
+        _EMI_KW_RE.search(desc_lower) is not None,
+        _HOME_LOAN_RE.search(desc_lower) is not None,
+        'personal' in desc_lower,
+    )
+
+
 def categorize_transaction_smart(description, amount):
     """Enhanced categorization with Indian Banks & NBFCs"""
-    desc_lower = str(description).lower()
-    
+    # Descriptions are almost always str already; skip the str() copy then
+    desc_lower = (description if isinstance(description, str) else str(description)).lower()
+
+    rule, has_credit, is_financial, has_emi_keyword, is_home_loan, is_personal = \
+        _description_features(desc_lower)
+
     # Income patterns
-    income_patterns = [
-        'capital one', 'credited', 'neft', 'nft', 'salary credited', 
-        'payment from', 'received', 'self transfer in', 'imt', 'ift',
-        'sweep from', 'rev sweep', 'cms/', 'inf/inft'
-    ]
-    if any(pattern in desc_lower for pattern in income_patterns):
+    if rule == 0:
         return 'income', 'Income'
     
     # Large credits are likely income
-    if amount > 10000 and 'credit' in desc_lower:
+    if amount > 10000 and has_credit:
         return 'income', 'Income'
     
-    # EMI/Loan detection for Indian banks and NBFCs
-    # Major Indian Banks (public sector)
-    public_banks = ['state bank', 'sbi', 'bank of baroda', 'canara bank', 'union bank', 
-                    'indian bank', 'pnb', 'punjab national', 'bank of india', 'central bank',
-                    'oriental bank', 'obc', 'uco bank', 'iob', 'indian overseas']
-    
-    # Private banks
-    private_banks = ['hdfc bank', 'hdfc', 'icici bank', 'icici', 'axis bank', 'kotak',
-                     'indusind', 'yes bank', 'idfc first', 'idfc', 'federal bank', 'rbl']
-    
-    # HFCs (Housing Finance Companies)
-    hfcs = ['canfin homes', 'canfin', 'canfinhomes', 'lic housing', 'dhfl', 'dewan housing',
-            'repco home', 'adani capital', 'poonawalla']
-    
-    # NBFCs
-    nbfcs = ['bajaj finserv', 'bajaj finance', 'bajaj', 'tata capital', 'tata finance',
-             'mahindra finance', 'shriram', 'muthoot', 'manappuram', 'cholamandalam',
-             'sundaram finance', 'fullerton']
-    
-    # Check if transaction involves any bank/HFC/NBFC (likely EMI if debit)
-    all_financial = public_banks + private_banks + hfcs + nbfcs
-    is_financial = any(bank in desc_lower for bank in all_financial)
-    
-    # Check for EMI keywords
-    emi_keywords = ['emi', 'loan', 'personal loan', 'installment', 'repayment', 'principal']
-    has_emi_keyword = any(keyword in desc_lower for keyword in emi_keywords)
-    
-    # If it's a financial institution debit with EMI keywords or large amount
+    # EMI/Loan detection for Indian banks and NBFCs:
+    # a financial institution debit with EMI keywords or large amount
     if is_financial and (has_emi_keyword or amount > 30000):
         # Determine specific loan type
-        if any(x in desc_lower for x in ['home', 'housing', 'mortgage', 'canfin']):
+        if is_home_loan:
             return 'emi', 'Home Loan EMI'
-        elif 'personal' in desc_lower or 'personal loan' in desc_lower:
+        elif is_personal:
             return 'emi', 'Personal Loan EMI'
         else:
             return 'emi', 'Loan EMI'
-    
-    # Investment
-    if any(x in desc_lower for x in ['sip', 'sipg', 'mutual fund', 'investment', 'apy_', 'fortune']):
-        return 'investment', 'Investment'
-    
-    # Insurance
-    if any(x in desc_lower for x in ['insurance', 'premium', 'sbi life', 'life insurance', 'lic']):
-        return 'expense', 'Insurance'
-    
-    # Food expenses
-    if any(x in desc_lower for x in ['swiggy', 'zomato', 'uber eats', 'food', 'restaurant']):
-        return 'expense', 'Food & Dining'
-    
-    # Cash withdrawals
-    if any(x in desc_lower for x in ['nfs/cash', 'cash wdl', 'atm', 'cash withdrawal']):
-        return 'expense', 'Cash Withdrawal'
-    
-    # Transport
-    if any(x in desc_lower for x in ['fastag', 'toll', 'fuel', 'petrol', 'hp pay', 'indianoil']):
-        return 'expense', 'Transport'
-    
-    # Medical
-    if any(x in desc_lower for x in ['medical', 'pharmacy', 'apollo', 'hospital']):
-        return 'expense', 'Medical'
-    
-    # Groceries
-    if any(x in desc_lower for x in ['grocery', 'bigbasket', 'dmart']):
-        return 'expense', 'Groceries'
-    
-    # Shopping/Retail
-    if any(x in desc_lower for x in ['amazon', 'flipkart', 'myntra', 'ajio', 'nykaa', 'meesho']):
-        return 'expense', 'Shopping'
-    
-    # Subscription services  
-    if any(x in desc_lower for x in ['netflix', 'spotify', 'disney', 'prime', 'youtube premium', 'subscription']):
-        return 'expense', 'Subscriptions'
-    
-    # Banking/Fees
-    if any(x in desc_lower for x in ['charges', 'fee', 'penalty', 'service charge', 'gst']):
-        return 'expense', 'Banking & Fees'
-    
-    # Utilities
-    if any(x in desc_lower for x in ['electricity', 'water', 'broadband', 'internet', 'wifi', 'spectra', 'act', 'reliance jio']):
-        return 'expense', 'Utilities'
-    
-    # Rent
-    if any(x in desc_lower for x in ['rent', 'rental', 'housing', 'accommodation']):
-        return 'expense', 'Rent'
-    
-    # Education
-    if any(x in desc_lower for x in ['school', 'college', 'education', 'tuition', 'course']):
-        return 'expense', 'Education'
-    
-    # UPI/Rewards
-    if any(x in desc_lower for x in ['cashback', 'reward', 'discount', 'vouchers']):
-        return 'income', 'Rewards & Cashback'
-    
+
+    # Remaining categories are description-only
+    if rule is not None:
+        _, category_type, category_name = _KEYWORD_RULES[rule]
+        return category_type, category_name
+
     return 'expense', 'Other'
 
 
-def load_csv_to_db(csv_path, user_id):
-    """Load CSV transactions to database"""
-    db = DatabaseManager(Config.DATABASE_URL)
-    session = db.get_session()
-    
+def categorize_transactions_vectorized(descriptions, amounts):
+    """
+    Categorize a column of descriptions at once (same rules as categorize_transaction_smart)
+
+    Statements repeat the same descriptions heavily, so each rule is one
+    regex scan over the distinct descriptions only; the per-description
+    results are broadcast back to rows via the factorized codes, and
+    np.select then picks the first matching rule per row.
+
+    Args:
+        descriptions: pandas Series of description strings
+        amounts: array of transaction amounts aligned with descriptions
+
+    Returns:
+        Tuple of (category_types, category_names) NumPy arrays
+    """
+    if not pd.api.types.is_string_dtype(descriptions):
+        descriptions = descriptions.astype(str)
+    codes, uniques = pd.factorize(descriptions, use_na_sentinel=False)
+    desc_lower = pd.Series(uniques, dtype=object).astype(str).str.lower()
+    amounts = np.asarray(amounts, dtype=float)
+
+    def contains(pattern):
+        matched = desc_lower.str.contains(pattern, regex=not isinstance(pattern, str)).to_numpy(dtype=bool)
+        return matched[codes]
+
+    is_income = contains(_INCOME_RE) | ((amounts > 10000) & contains('credit'))
+    is_emi = contains(_FINANCIAL_RE) & (contains(_EMI_KW_RE) | (amounts > 30000))
+
+    conditions = [
+        is_income,
+        is_emi & contains(_HOME_LOAN_RE),
+        is_emi & contains('personal'),
+        is_emi,
+    ] + [contains(pattern) for pattern in _CATEGORY_RULE_RES]
+    types = ['income', 'emi', 'emi', 'emi'] + [t for _, t, _ in CATEGORY_RULES]
+    names = ['Income', 'Home Loan EMI', 'Personal Loan EMI', 'Loan EMI'] + [c for _, _, c in CATEGORY_RULES]
+
+    category_types = np.select(conditions, types, default='expense')
+    category_names = np.select(conditions, names, default='Other')
+    return category_types, category_names
+
+
+def bulk_insert_transactions(session, records):
+    """
+    Insert transaction rows without building ORM instances
+
+    One executemany INSERT on the session's connection (same transaction);
+    on PostgreSQL SQLAlchemy batches it into multi-row VALUES statements.
+    Column defaults (ingestion and created/updated timestamps) are applied
+    per row as with ORM inserts.
+    """
+    if not records:
+        return
+
+    session.execute(insert(BankTransaction), records)
+
+
+def load_csv_to_db(csv_path, user_id, session):
+    """
+    Load CSV transactions to database
+
+    Uses the caller's session; pending changes on it (e.g. clearing the
+    user's old rows) are committed together with the inserted transactions.
+    """
     try:
-        # Read CSV
-        df = pd.read_csv(csv_path, encoding='utf-8-sig')
-        logger.info(f"Reading {len(df)} rows from CSV")
-        
-        # Clean column names
-        df.columns = df.columns.str.strip()
+        # Read only the header first to detect columns
+        header = pd.read_csv(csv_path, encoding='utf-8-sig', nrows=0)
+
+        # Clean column names (stripped name -> name as it appears in the file)
+        raw_columns = {str(col).strip(): col for col in header.columns}
         
         # Detect columns
         date_col = None
@@ -176,7 +310,7 @@ def load_csv_to_db(csv_path, user_id):
         debit_col = None
         credit_col = None
         
-        for col in df.columns:
+        for col in raw_columns:
             col_lower = str(col).lower()
             if 'date' in col_lower and not date_col:
                 date_col = col
@@ -186,57 +320,95 @@ def load_csv_to_db(csv_path, user_id):
                 debit_col = col
             elif any(x in col_lower for x in ['deposit', 'credit', 'received']):
                 credit_col = col
+
+        # Read CSV: detected columns only, with explicit dtypes
+        detected = [col for col in (date_col, desc_col, debit_col, credit_col) if col]
+        dtype = {raw_columns[col]: 'string' for col in (date_col, desc_col) if col}
+        dtype.update({raw_columns[col]: 'float64' for col in (debit_col, credit_col) if col})
+        try:
+            df = pd.read_csv(
+                csv_path,
+                encoding='utf-8-sig',
+                engine=CSV_ENGINE,
+                usecols=[raw_columns[col] for col in detected],
+                dtype=dtype
+            )
+        except ValueError as e:
+            # Non-numeric amount cells: read amounts as text, coerced below
+            logger.warning(f"Amount columns are not purely numeric ({e}); reading them as text")
+            df = pd.read_csv(
+                csv_path,
+                encoding='utf-8-sig',
+                usecols=[raw_columns[col] for col in detected],
+                dtype={raw_columns[col]: 'string' for col in detected}
+            )
+        df.columns = df.columns.str.strip()
+        logger.info(f"Reading {len(df)} rows from CSV")
         
         logger.info(f"Detected columns: date={date_col}, desc={desc_col}, debit={debit_col}, credit={credit_col}")
         
-        transactions_count = 0
         assets_count = 0
-        
-        for idx, row in df.iterrows():
-            try:
-                date = str(row[date_col]).strip() if date_col and pd.notna(row.get(date_col)) else ""
-                description = str(row[desc_col]).strip() if desc_col and pd.notna(row.get(desc_col)) else ""
-                
-                # Get amount and type
-                amount = 0
-                trans_type = "debit"
-                
-                if debit_col and pd.notna(row.get(debit_col)) and float(row[debit_col]) > 0:
-                    amount = float(row[debit_col])
-                    trans_type = "debit"
-                elif credit_col and pd.notna(row.get(credit_col)) and float(row[credit_col]) > 0:
-                    amount = float(row[credit_col])
-                    trans_type = "credit"
-                else:
-                    continue  # Skip rows without valid amounts
-                
-                # Categorize
-                category_type, category_name = categorize_transaction_smart(description, amount)
-                
-                # Create transaction
-                transaction = Transaction(
-                    transaction_id=str(uuid.uuid4()),
-                    user_id=user_id,
-                    date=date,
-                    amount=amount,
-                    type=trans_type,
-                    description_raw=description,
-                    merchant_canonical=category_name,
-                    category=category_name,
-                    month=format_month(date),
-                    source='csv_import'
-                )
-                session.add(transaction)
-                transactions_count += 1
-                
-                # NOTE: Don't create assets for investments automatically
-                # Assets should be manually added by user for their actual portfolio
-                # Investment transactions are tracked separately
-                
-            except Exception as e:
-                logger.warning(f"Error processing row {idx}: {e}")
-                continue
-        
+
+        def text_column(col):
+            if not col:
+                return pd.Series('', index=df.index)
+            return df[col].astype(str).str.strip().where(df[col].notna(), '')
+
+        def amount_column(col):
+            if not col:
+                return np.zeros(len(df))
+            return pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=float)
+
+        # Column-wise extraction instead of iterrows
+        dates = text_column(date_col).to_numpy()
+        descriptions = text_column(desc_col).to_numpy()
+        amt_debit = amount_column(debit_col)
+        amt_credit = amount_column(credit_col)
+
+        # Debit takes precedence; rows without a positive amount are skipped
+        is_debit = amt_debit > 0
+        valid = is_debit | (amt_credit > 0)
+        amounts = np.where(is_debit, amt_debit, amt_credit)
+        trans_types = np.where(is_debit, 'debit', 'credit')
+
+        # Categorize all valid rows at once
+        _, category_names = categorize_transactions_vectorized(
+            pd.Series(descriptions[valid]), amounts[valid]
+        )
+
+        months = format_months(dates[valid])
+        transaction_ids = gen_uuids(int(valid.sum()))
+        # Rule labels without a matching TransactionCategory are stored as Other
+        # and kept verbatim in transaction_sub_type
+        categories = {name: _CATEGORY_BY_VALUE.get(name, TransactionCategory.OTHER)
+                      for name in set(category_names.tolist())}
+
+        records = []
+        for transaction_id, date, description, amount, trans_type, category_name, month in zip(
+            transaction_ids, dates[valid].tolist(), descriptions[valid].tolist(),
+            amounts[valid].tolist(), trans_types[valid].tolist(),
+            category_names.tolist(), months.tolist()
+        ):
+            # NOTE: Don't create assets for investments automatically
+            # Assets should be manually added by user for their actual portfolio
+            # Investment transactions are tracked separately
+            records.append({
+                'transaction_id': transaction_id,
+                'user_id': user_id,
+                'date': date,
+                'amount': amount,
+                'type': TransactionType(trans_type),
+                'description_raw': description,
+                'merchant_canonical': category_name,
+                'category': categories[category_name],
+                'transaction_sub_type': category_name,
+                'month': month,
+                'source': TransactionSource.CSV
+            })
+
+        bulk_insert_transactions(session, records)
+        transactions_count = len(records)
+
         session.commit()
         logger.info(f"✅ Loaded {transactions_count} transactions and {assets_count} assets")
         
@@ -244,9 +416,6 @@ def load_csv_to_db(csv_path, user_id):
         session.rollback()
         logger.error(f"Error: {e}", exc_info=True)
         raise
-    finally:
-        session.close()
-        db.close()
 
 
 def main():
@@ -276,15 +445,14 @@ def main():
         
         user_id = user.user_id
         
-        # Clear existing data
+        # Clear existing data (committed together with the load below)
         print("🗑️  Clearing existing transactions and assets...")
-        session.query(Transaction).filter(Transaction.user_id == user_id).delete()
+        session.query(BankTransaction).filter(BankTransaction.user_id == user_id).delete()
         session.query(Asset).filter(Asset.user_id == user_id).delete()
-        session.commit()
         
         # Load CSV data
         print("📊 Loading CSV data...")
-        load_csv_to_db(csv_path, user_id)
+        load_csv_to_db(csv_path, user_id, session)
         
         print("\n" + "="*60)
         print("✅ DATA LOADED SUCCESSFULLY!")
@@ -2,6 +2,6 @@
 Privacy vault module for PII encryption and management
 """
 
-from .vault import PrivacyVault
+from .vault import PrivacyVault, VaultWriteError
 
-__all__ = ['PrivacyVault']
+__all__ = ['PrivacyVault', 'VaultWriteError']
@@ -3,6 +3,9 @@ Privacy Vault - Secure PII Storage with AES-256-GCM Encryption
 
 Stores sensitive PII (account numbers, card numbers, etc.) encrypted at rest.
 Uses reference IDs in main database, actual data encrypted in vault.
+
+Each entry is encrypted separately into its own `<ref_id>.enc` file inside the
+vault directory, so storing or deleting one entry never re-encrypts the rest.
 """
 
 import os
@@ -10,14 +13,177 @@ import json
 import logging
 import hashlib
 import shutil
+import functools
+import atexit
+import threading
+import time
+import weakref
 from typing import Optional, Dict, Any
 from pathlib import Path
 from datetime import datetime
+from cryptography.hazmat.backends.openssl import backend as openssl_backend
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 import base64
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Audit log write buffer and how many buffered RETRIEVE entries may be pending
+AUDIT_BUFFER_SIZE = 1 << 16
+AUDIT_FLUSH_EVERY = 64
+
+# How long the background writer waits to coalesce bursts of entry changes
+SAVE_DEBOUNCE_SECONDS = 0.1
+
+# GCM nonces are drawn from os.urandom this many at a time
+NONCE_SIZE = 12  # 96 bits for GCM
+NONCE_BATCH = 256
+
+# Access counters are in-memory, and persisted at most this often (and on close)
+ACCESS_PERSIST_SECONDS = 30.0
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes (orjson when available)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# Every zstd frame starts with this magic; JSON plaintext never does, so
+# compressed and uncompressed entries can be told apart
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Raw-content zstd dictionary holding the entry layout (keys and common values,
+# no PII), so even ~150-byte entries compress. Do not change it: existing
+# entries need the exact same dictionary to decompress.
+ZSTD_ENTRY_DICT = (
+    b'{"data":"","entity_type":"generic","entity_type":"card_number",'
+    b'"entity_type":"account_number","created_at":"20","accessed_count":0,'
+    b'"last_accessed":null}'
+)
+
+
+# (epoch second, its formatted 'YYYY-MM-DDTHH:MM:SS') for _now_iso
+_ts_cache = (None, '')
+
+
+def _now_iso() -> str:
+    """Local time as an ISO 8601 string, formatting the date/time part once per second"""
+    global _ts_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _ts_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second).strftime('%Y-%m-%dT%H:%M:%S')
+        _ts_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1_000_000):06d}"
+
+
+class VaultWriteError(IOError):
+    """Raised when queued vault entry changes could not be written to disk"""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = failures
+        details = ', '.join(f"{ref_id[:8]}...: {e}" for ref_id, e in failures.items())
+        super().__init__(f"Failed to write {len(failures)} vault entries ({details})")
+
+
+def _writer_loop(vault_ref: 'weakref.ref[PrivacyVault]', pending_event: threading.Event):
+    """
+    Background writer: persist a vault's queued changes, coalescing bursts
+    within SAVE_DEBOUNCE_SECONDS
+
+    Holds the vault only through a weak reference between rounds, so an
+    unused vault can still be garbage collected (its close() stops the loop).
+    Failed writes stay queued and are retried on the next flush.
+    """
+    while True:
+        pending_event.wait()
+        vault = vault_ref()
+        if vault is None or vault._stop_writer:
+            return
+        time.sleep(SAVE_DEBOUNCE_SECONDS)
+        try:
+            vault.flush()
+        except VaultWriteError as e:
+            logger.error(f"Background vault write failed, changes kept queued: {e}")
+        # close() may have signalled while flush() was clearing the event, or
+        # dropping the last reference here may have closed the vault
+        stop = vault._stop_writer
+        del vault
+        if stop or vault_ref() is None:
+            return
+
+
+def _close_at_exit(vault_ref: 'weakref.ref[PrivacyVault]'):
+    """atexit hook closing a vault that is still alive"""
+    vault = vault_ref()
+    if vault is not None:
+        try:
+            vault.close()
+        except VaultWriteError as e:
+            logger.error(f"Vault changes lost at exit: {e}")
+
+
+# AESGCM ciphers by raw key, shared by vault instances using the same key
+_CIPHER_CACHE: Dict[bytes, AESGCM] = {}
+_CIPHER_CACHE_LOCK = threading.Lock()
+
+
+def _get_cipher(key_raw: bytes) -> AESGCM:
+    """AESGCM cipher for a raw key, set up (key schedule) once per process"""
+    with _CIPHER_CACHE_LOCK:
+        cipher = _CIPHER_CACHE.get(key_raw)
+        if cipher is None:
+            cipher = _CIPHER_CACHE[key_raw] = AESGCM(key_raw)
+        return cipher
+
+
+# CPU flags OpenSSL needs for hardware AES-GCM (x86: AES-NI + CLMUL, ARM: AES + PMULL)
+AES_GCM_CPU_FLAGS = ({'aes', 'pclmulqdq'}, {'aes', 'pmull'})
+
+
+@functools.lru_cache(maxsize=None)
+def aes_acceleration_status() -> Dict[str, Any]:
+    """
+    Report whether AES-GCM can run on hardware instructions
+
+    Returns:
+        Dict with the OpenSSL build cryptography is linked against and
+        'hardware_aes': True/False, or None if CPU flags can't be read
+        (non-Linux platforms).
+    """
+    cpu_flags = None
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith(('flags', 'Features')):
+                    cpu_flags = set(line.split(':', 1)[1].split())
+                    break
+    except OSError:
+        pass
+
+    return {
+        'openssl': openssl_backend.openssl_version_text(),
+        'hardware_aes': None if cpu_flags is None else any(
+            required <= cpu_flags for required in AES_GCM_CPU_FLAGS
+        ),
+    }
+
 
 class PrivacyVault:
     """
@@ -30,33 +196,102 @@ class PrivacyVault:
     - Key rotation support
     """
 
-    def __init__(self, vault_path: str = "data/privacy_vault.enc", key: Optional[str] = None):
+    def __init__(self, vault_path: str = "data/privacy_vault", key: Optional[str] = None,
+                 read_only: bool = False):
         """
         Initialize privacy vault
 
         Args:
-            vault_path: Path to encrypted vault file
+            vault_path: Path to vault directory (one encrypted file per entry).
+                        A legacy single-file vault at `<vault_path>.enc` is
+                        migrated into it on first load; a legacy path given
+                        directly ('data/privacy_vault.enc') is migrated into
+                        the directory beside it ('data/privacy_vault').
             key: Encryption key (base64-encoded 256-bit key)
                  If None, will try to load from .vault_key file or generate new
+            read_only: Don't track access counts on retrieval
         """
-        self.vault_path = Path(vault_path)
-        self.vault_path.parent.mkdir(parents=True, exist_ok=True)
+        vault_path = Path(vault_path)
+        if vault_path.suffix == '.enc' and not vault_path.is_dir():
+            vault_path = vault_path.with_suffix('')
+        self.vault_path = vault_path
+        self.read_only = read_only
+        self.vault_path.mkdir(parents=True, exist_ok=True)
 
-        # Load or generate encryption key
-        self.key = self._init_key(key)
+        # Make sure encryption runs on hardware AES-GCM
+        self._check_aes_acceleration()
 
-        # Initialize AESGCM cipher
-        self.cipher = AESGCM(base64.b64decode(self.key))
+        # Load or generate encryption key (raw 256-bit key; base64 only for I/O)
+        self._key_raw = base64.b64decode(self._init_key(key))
+
+        # Initialize AESGCM cipher (shared with other vaults using this key)
+        self.cipher = _get_cipher(self._key_raw)
+
+        # Entry compression (zstd with the shared layout dictionary)
+        if ZSTD_AVAILABLE:
+            entry_dict = zstd.ZstdCompressionDict(ZSTD_ENTRY_DICT, dict_type=zstd.DICT_TYPE_RAWCONTENT)
+            self._zstd_compressor = zstd.ZstdCompressor(level=3, dict_data=entry_dict, write_dict_id=False)
+            self._zstd_decompressor = zstd.ZstdDecompressor(dict_data=entry_dict)
 
         # In-memory vault data
         self.vault_data: Dict[str, Dict] = {}
 
-        # Audit log
+        # Entry changes not yet on disk (ref_id -> True: write, False: delete),
+        # persisted by a background writer thread started on first change
+        self._pending: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+        self._io_lock = threading.RLock()
+        self._pending_event = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._stop_writer = False
+
+        # Close (write pending changes) at exit; the hook only holds a weak
+        # reference and is unregistered by close()
+        self._atexit_hook = functools.partial(_close_at_exit, weakref.ref(self))
+        atexit.register(self._atexit_hook)
+
+        # Pre-drawn random nonces (refilled per NONCE_BATCH, discarded after fork)
+        self._nonce_pool = b''
+        self._nonce_offset = 0
+        self._nonce_pid = os.getpid()
+        self._nonce_lock = threading.Lock()
+
+        # Entries whose access counters changed since they were last persisted
+        self._access_dirty = set()
+        self._access_persisted_at = time.monotonic()
+
+        # Audit log (one append handle for the vault's lifetime)
         self.audit_log_path = self.vault_path.parent / "vault_audit.log"
+        self._audit_fh = None
+        self._audit_pending = 0
 
         # Load vault if exists
         self._load_vault()
 
+    @property
+    def key(self) -> str:
+        """Base64-encoded encryption key, as stored in .vault_key / VAULT_KEY"""
+        return base64.b64encode(self._key_raw).decode('utf-8')
+
+    @staticmethod
+    def _check_aes_acceleration():
+        """
+        Log the crypto backend and flag CPUs without hardware AES-GCM
+
+        Without AES-NI/CLMUL, OpenSSL falls back to constant-time software AES
+        and GHASH, which is an order of magnitude slower. Set
+        VAULT_REQUIRE_HW_AES=true (e.g. in production) to refuse to start.
+        """
+        status = aes_acceleration_status()
+        logger.debug(f"Vault crypto backend: {status['openssl']}")
+
+        if status['hardware_aes'] is False:
+            logger.critical(
+                f"CPU lacks AES-NI/CLMUL instructions; AES-GCM will run in software ({status['openssl']})"
+            )
+            if os.getenv('VAULT_REQUIRE_HW_AES', 'false').lower() == 'true':
+                raise RuntimeError("Hardware AES-GCM is required (VAULT_REQUIRE_HW_AES=true) but not available")
+
     def _init_key(self, key: Optional[str]) -> str:
         """
         Initialize encryption key
@@ -116,89 +351,231 @@ class PrivacyVault:
         except Exception as e:
             logger.warning(f"Failed to set file permissions: {e}")
 
-    def _load_vault(self):
-        """Load and decrypt vault from disk"""
-        if not self.vault_path.exists():
-            logger.info(f"Vault file not found: {self.vault_path}, creating new vault")
-            self.vault_data = {}
-            return
+    def _entry_path(self, ref_id: str) -> Path:
+        """Path of the encrypted file holding one vault entry"""
+        return self.vault_path / f"{ref_id}.enc"
 
-        try:
-            with open(self.vault_path, 'rb') as f:
-                encrypted_data = f.read()
+    def _load_vault(self):
+        """Load and decrypt all vault entries from disk"""
+        self.vault_data = {}
 
-            # Decrypt vault
-            decrypted_data = self._decrypt_data(encrypted_data)
-            self.vault_data = json.loads(decrypted_data)
+        for entry_path in self.vault_path.glob('*.enc'):
+            ref_id = entry_path.stem
+            try:
+                with open(entry_path, 'rb') as f:
+                    encrypted_data = f.read()
 
-            logger.info(f"Loaded vault with {len(self.vault_data)} entries")
+                # Decrypt entry (ref_id is bound as associated data)
+                decrypted_data = self._decrypt_data(encrypted_data, ref_id.encode())
+                self.vault_data[ref_id] = _loads(self._decompress(decrypted_data))
 
-        except Exception as e:
-            logger.error(f"Failed to load vault: {e}")
-            # Create backup and start fresh
-            if self.vault_path.exists():
-                backup_path = self.vault_path.with_suffix('.backup')
-                shutil.copy(self.vault_path, backup_path)
+            except Exception as e:
+                logger.error(f"Failed to load vault entry {ref_id[:8]}...: {e}")
+                # Set the unreadable entry aside and keep loading the rest
+                backup_path = entry_path.with_suffix('.backup')
+                shutil.move(entry_path, backup_path)
                 logger.info(f"Created backup: {backup_path}")
-            self.vault_data = {}
 
-    def _save_vault(self):
-        """Encrypt and save vault to disk"""
-        try:
-            # Serialize vault data
-            json_data = json.dumps(self.vault_data, indent=2)
+        self._migrate_legacy_vault()
 
-            # Encrypt data
-            encrypted_data = self._encrypt_data(json_data.encode('utf-8'))
+        logger.info(f"Loaded vault with {len(self.vault_data)} entries")
 
-            # Save to file
-            with open(self.vault_path, 'wb') as f:
-                f.write(encrypted_data)
+    def _migrate_legacy_vault(self):
+        """Split a legacy single-file vault (`<vault_path>.enc`) into per-entry files"""
+        legacy_path = self.vault_path.with_suffix('.enc')
+        if not legacy_path.is_file():
+            return
 
-            # Set file permissions to 600
-            os.chmod(self.vault_path, 0o600)
+        try:
+            with open(legacy_path, 'rb') as f:
+                legacy_data = _loads(self._decrypt_data(f.read()))
+        except Exception as e:
+            logger.error(f"Failed to load legacy vault {legacy_path}: {e}")
+            return
 
-            logger.debug(f"Saved vault with {len(self.vault_data)} entries")
+        for ref_id, entry in legacy_data.items():
+            self.vault_data[ref_id] = entry
+        try:
+            self._save_vault()
+        except VaultWriteError as e:
+            # Keep the legacy file; the entries stay queued for the next flush
+            logger.error(f"Failed to migrate legacy vault {legacy_path}: {e}")
+            return
 
-        except Exception as e:
-            logger.error(f"Failed to save vault: {e}")
-            raise
+        migrated_path = legacy_path.with_suffix('.enc.migrated')
+        legacy_path.rename(migrated_path)
+        logger.info(f"Migrated {len(legacy_data)} entries from legacy vault {legacy_path} (kept as {migrated_path})")
+
+    def _write_entry(self, ref_id: str, entry: Dict):
+        """Encrypt one vault entry and atomically replace its file on disk"""
+        entry_path = self._entry_path(ref_id)
+        tmp_path = entry_path.with_suffix('.tmp')
+
+        # Serialize, compress and encrypt just this entry
+        encrypted_data = self._encrypt_data(self._compress(_dumps(entry)), ref_id.encode())
+
+        # Write to a temp file, then swap it in (a crash never leaves a torn entry)
+        with open(tmp_path, 'wb') as f:
+            f.write(encrypted_data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Set file permissions to 600
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, entry_path)
+
+    def _save_entry(self, ref_id: str):
+        """Queue a vault entry to be written by the background writer"""
+        self._queue_change(ref_id, True)
+
+    def _delete_entry(self, ref_id: str):
+        """Queue removal of a vault entry's file"""
+        self._queue_change(ref_id, False)
+
+    def _queue_change(self, ref_id: str, keep: bool):
+        """Record a pending entry change and wake the background writer"""
+        with self._lock:
+            self._pending[ref_id] = keep
+            if self._writer is None or not self._writer.is_alive():
+                self._stop_writer = False
+                self._writer = threading.Thread(
+                    target=_writer_loop, args=(weakref.ref(self), self._pending_event),
+                    name='vault-writer', daemon=True,
+                )
+                self._writer.start()
+                # Re-arm the exit hook in case the vault was closed and reused
+                atexit.unregister(self._atexit_hook)
+                atexit.register(self._atexit_hook)
+        self._pending_event.set()
+
+    def flush(self):
+        """
+        Write all pending entry changes to disk now
 
-    def _encrypt_data(self, data: bytes) -> bytes:
+        Raises:
+            VaultWriteError: If any entry could not be written or removed.
+                Every other change is still written; the failed ones stay
+                queued and are retried by the next flush.
+        """
+        with self._io_lock:
+            with self._lock:
+                self._pending_event.clear()
+                pending, self._pending = self._pending, {}
+                entries = {
+                    ref_id: dict(self.vault_data[ref_id])
+                    for ref_id, keep in pending.items()
+                    if keep and ref_id in self.vault_data
+                }
+
+            failures = {}
+            for ref_id in pending:
+                try:
+                    if ref_id in entries:
+                        self._write_entry(ref_id, entries[ref_id])
+                    else:
+                        self._entry_path(ref_id).unlink(missing_ok=True)
+                except Exception as e:
+                    logger.error(f"Failed to save vault entry {ref_id[:8]}...: {e}")
+                    failures[ref_id] = e
+
+            if failures:
+                # Re-queue failed changes unless a newer change replaced them meanwhile
+                with self._lock:
+                    for ref_id in failures:
+                        self._pending.setdefault(ref_id, pending[ref_id])
+                raise VaultWriteError(failures)
+
+    def _persist_access_counts(self):
+        """Queue entries with changed access counters for the background writer"""
+        self._access_persisted_at = time.monotonic()
+        dirty, self._access_dirty = self._access_dirty, set()
+        for ref_id in dirty:
+            if ref_id in self.vault_data:
+                self._save_entry(ref_id)
+
+    def _save_vault(self):
+        """
+        Encrypt and save every vault entry to disk (e.g. after key rotation)
+
+        Raises:
+            VaultWriteError: If any entry could not be written
+        """
+        with self._lock:
+            self._pending.update(dict.fromkeys(self.vault_data, True))
+        self.flush()
+
+        logger.debug(f"Saved vault with {len(self.vault_data)} entries")
+
+    def _compress(self, data: bytes) -> bytes:
+        """zstd-compress entry plaintext when that makes it smaller"""
+        if not ZSTD_AVAILABLE:
+            return data
+        compressed = self._zstd_compressor.compress(data)
+        return compressed if len(compressed) < len(data) else data
+
+    def _decompress(self, data: bytes) -> bytes:
+        """Undo _compress (uncompressed entries are returned as-is)"""
+        if not data.startswith(ZSTD_MAGIC):
+            return data
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("Vault entry is zstd-compressed but zstandard is not installed")
+        return self._zstd_decompressor.decompress(data)
+
+    def _encrypt_data(self, data: bytes, associated_data: Optional[bytes] = None) -> bytes:
         """
         Encrypt data using AES-256-GCM
 
         Args:
             data: Plaintext bytes
+            associated_data: Authenticated but unencrypted data (e.g. the ref_id)
 
         Returns:
             Encrypted bytes (nonce + ciphertext + tag)
         """
-        # Generate random nonce
-        nonce = os.urandom(12)  # 96 bits for GCM
+        # Take a fresh random nonce
+        nonce = self._next_nonce()
 
         # Encrypt
-        ciphertext = self.cipher.encrypt(nonce, data, None)
+        ciphertext = self.cipher.encrypt(nonce, data, associated_data)
 
         # Return nonce + ciphertext (GCM includes authentication tag in ciphertext)
         return nonce + ciphertext
 
-    def _decrypt_data(self, encrypted_data: bytes) -> bytes:
+    def _next_nonce(self) -> bytes:
+        """
+        Next random GCM nonce, drawn from os.urandom NONCE_BATCH at a time
+
+        Nonces stay random rather than counter-based: several vault
+        instances and processes may share one key, and per-instance
+        counters could then repeat a nonce. The pool is thrown away in a
+        forked child so parent and child never hand out the same bytes.
+        """
+        with self._nonce_lock:
+            if self._nonce_pid != os.getpid() or self._nonce_offset >= len(self._nonce_pool):
+                self._nonce_pool = os.urandom(NONCE_SIZE * NONCE_BATCH)
+                self._nonce_offset = 0
+                self._nonce_pid = os.getpid()
+            start = self._nonce_offset
+            self._nonce_offset += NONCE_SIZE
+        return self._nonce_pool[start:start + NONCE_SIZE]
+
+    def _decrypt_data(self, encrypted_data: bytes, associated_data: Optional[bytes] = None) -> bytes:
         """
         Decrypt data using AES-256-GCM
 
         Args:
             encrypted_data: Encrypted bytes (nonce + ciphertext + tag)
+            associated_data: Associated data the entry was encrypted with
 
         Returns:
             Plaintext bytes
         """
         # Extract nonce
-        nonce = encrypted_data[:12]
-        ciphertext = encrypted_data[12:]
+        nonce = encrypted_data[:NONCE_SIZE]
+        ciphertext = encrypted_data[NONCE_SIZE:]
 
         # Decrypt
-        plaintext = self.cipher.decrypt(nonce, ciphertext, None)
+        plaintext = self.cipher.decrypt(nonce, ciphertext, associated_data)
 
         return plaintext
 
@@ -220,13 +597,13 @@ class PrivacyVault:
         self.vault_data[ref_id] = {
             'data': pii_data,
             'entity_type': entity_type,
-            'created_at': datetime.now().isoformat(),
+            'created_at': _now_iso(),
             'accessed_count': 0,
             'last_accessed': None,
         }
 
-        # Save vault
-        self._save_vault()
+        # Queue only this entry for the background writer
+        self._save_entry(ref_id)
 
         # Audit log
         self._audit_log('STORE', ref_id, entity_type)
@@ -249,9 +626,13 @@ class PrivacyVault:
             logger.warning(f"PII not found for ref_id: {ref_id[:8]}...")
             return None
 
-        # Update access metadata
-        self.vault_data[ref_id]['accessed_count'] += 1
-        self.vault_data[ref_id]['last_accessed'] = datetime.now().isoformat()
+        # Update access metadata in memory; persisted in periodic batches
+        if not self.read_only:
+            self.vault_data[ref_id]['accessed_count'] += 1
+            self.vault_data[ref_id]['last_accessed'] = _now_iso()
+            self._access_dirty.add(ref_id)
+            if time.monotonic() - self._access_persisted_at >= ACCESS_PERSIST_SECONDS:
+                self._persist_access_counts()
 
         # Get data
         pii_data = self.vault_data[ref_id]['data']
@@ -279,9 +660,7 @@ class PrivacyVault:
 
         # Delete from vault
         del self.vault_data[ref_id]
-
-        # Save vault
-        self._save_vault()
+        self._delete_entry(ref_id)
 
         # Audit log
         self._audit_log('DELETE', ref_id, entity_type)
@@ -296,31 +675,90 @@ class PrivacyVault:
         return hashlib.sha256(data.encode()).hexdigest()
 
     def _audit_log(self, action: str, ref_id: str, entity_type: str):
-        """Write audit log entry"""
+        """
+        Write audit log entry
+
+        Entries go through a persistent buffered handle. Reads (RETRIEVE) are
+        flushed in batches of AUDIT_FLUSH_EVERY; changes to the vault are
+        flushed immediately.
+        """
         try:
             log_entry = {
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'action': action,
                 'ref_id': ref_id[:8] + '...',  # Truncated for security
                 'entity_type': entity_type,
             }
 
-            with open(self.audit_log_path, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            if self._audit_fh is None:
+                self._audit_fh = open(self.audit_log_path, 'ab', buffering=AUDIT_BUFFER_SIZE)
+
+            self._audit_fh.write(_dumps(log_entry) + b'\n')
+
+            self._audit_pending += 1
+            if action != 'RETRIEVE' or self._audit_pending >= AUDIT_FLUSH_EVERY:
+                self.flush_audit_log()
 
         except Exception as e:
             logger.error(f"Failed to write audit log: {e}")
 
+    def flush_audit_log(self):
+        """Write any buffered audit log entries to disk"""
+        if self._audit_fh is not None:
+            self._audit_fh.flush()
+        self._audit_pending = 0
+
+    def close(self):
+        """
+        Write pending entry changes, stop the writer and close the audit log
+
+        Raises:
+            VaultWriteError: If pending changes could not be written
+        """
+        atexit.unregister(self._atexit_hook)
+
+        if self._access_dirty:
+            self._persist_access_counts()
+
+        if self._writer is not None:
+            self._stop_writer = True
+            self._pending_event.set()
+            # A vault collected by its own writer thread is closed on that thread
+            if self._writer is not threading.current_thread():
+                self._writer.join()
+            self._writer = None
+
+        try:
+            self.flush()
+        finally:
+            if self._audit_fh is not None:
+                self.flush_audit_log()
+                self._audit_fh.close()
+                self._audit_fh = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     def rotate_key(self, new_key: Optional[str] = None) -> bool:
         """
         Rotate encryption key
 
         Steps:
         1. Backup current vault
-        2. Decrypt all data with old key
-        3. Re-encrypt with new key
-        4. Save new key
-        5. Update vault
+        2. Re-encrypt all data (already decrypted in memory) with new key
+        3. Save new key
+
+        On any failure the old key (in memory and in .vault_key) and the
+        backed-up entry files are restored.
 
         Args:
             new_key: New encryption key (if None, generates new)
@@ -330,46 +768,63 @@ class PrivacyVault:
         """
         logger.info("Starting key rotation...")
 
-        # 1. Backup current vault
-        backup_path = self.vault_path.with_suffix(f'.backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}')
-        shutil.copy(self.vault_path, backup_path)
-        logger.info(f"Created backup: {backup_path}")
-
-        try:
-            # 2. Decrypt all data with old key (already in memory)
-            decrypted_data = self.vault_data.copy()
+        key_file = Path('.vault_key')
+        old_key_raw = self._key_raw
+        old_key_file = key_file.read_text() if key_file.is_file() else None
 
-            # 3. Generate or use new key
-            if not new_key:
-                new_key = self._generate_key()
+        # Hold off the background writer so no entry is written with a mix of keys
+        with self._io_lock:
+            # Make sure the backup includes every queued change
+            try:
+                self.flush()
+            except VaultWriteError as e:
+                logger.error(f"Key rotation aborted: {e}")
+                return False
+
+            # 1. Backup current vault
+            backup_path = self.vault_path.with_name(
+                f'{self.vault_path.name}.backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}'
+            )
+            shutil.copytree(self.vault_path, backup_path)
+            logger.info(f"Created backup: {backup_path}")
 
-            # Update key and cipher
-            self.key = new_key
-            self.cipher = AESGCM(base64.b64decode(self.key))
+            try:
+                if not new_key:
+                    new_key = self._generate_key()
 
-            # 4. Save new key
-            key_file = Path('.vault_key')
-            self._save_key(new_key, key_file)
+                # 2. Update key and cipher, then re-encrypt and save vault
+                self._key_raw = base64.b64decode(new_key)
+                self.cipher = _get_cipher(self._key_raw)
+                self._save_vault()
 
-            # 5. Re-encrypt and save vault
-            self.vault_data = decrypted_data
-            self._save_vault()
+                # 3. Save new key (only once every entry is encrypted with it)
+                self._save_key(new_key, key_file)
 
-            # Audit log
-            self._audit_log('KEY_ROTATION', 'N/A', 'vault')
+            except Exception as e:
+                logger.error(f"Key rotation failed: {e}")
+                # Restore the old key and the backed-up entries
+                self._key_raw = old_key_raw
+                self.cipher = _get_cipher(old_key_raw)
+                if old_key_file is None:
+                    key_file.unlink(missing_ok=True)
+                else:
+                    self._save_key(old_key_file, key_file)
+                shutil.rmtree(self.vault_path)
+                shutil.copytree(backup_path, self.vault_path)
+                logger.info("Restored from backup")
+                return False
 
-            logger.info("Key rotation completed successfully")
-            return True
+        # Audit log
+        self._audit_log('KEY_ROTATION', 'N/A', 'vault')
 
-        except Exception as e:
-            logger.error(f"Key rotation failed: {e}")
-            # Restore from backup
-            shutil.copy(backup_path, self.vault_path)
-            logger.info("Restored from backup")
-            return False
+        logger.info("Key rotation completed successfully")
+        return True
 
     def get_stats(self) -> Dict[str, Any]:
         """Get vault statistics"""
+        # Write queued changes so the on-disk size is current
+        self.flush()
+
         entity_types = {}
         for data in self.vault_data.values():
             entity_type = data['entity_type']
@@ -378,7 +833,7 @@ class PrivacyVault:
         return {
             'total_entries': len(self.vault_data),
             'entity_types': entity_types,
-            'vault_size_bytes': self.vault_path.stat().st_size if self.vault_path.exists() else 0,
+            'vault_size_bytes': sum(path.stat().st_size for path in self.vault_path.glob('*.enc')),
         }
 
 
@@ -8,14 +8,39 @@ Updates transactions with improved categorization rules for:
 """
 
 import sys
+import functools
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from sqlalchemy import select
+
 from storage.database import DatabaseManager
 from storage.models import User, Transaction, TransactionCategory
 from config import Config
 from src.classifier import rule_based_category
 
+# Rows streamed per fetch, and category updates written per bulk UPDATE batch
+FETCH_BATCH_SIZE = 10000
+UPDATE_BATCH_SIZE = 5000
+
+# Classifier category name (case-insensitive) -> TransactionCategory
+CATEGORY_BY_NAME = {cat.value.lower(): cat for cat in TransactionCategory}
+# Classifier names that differ from the enum values
+CATEGORY_ALIASES = {'food': TransactionCategory.FOOD_DINING}
+
+# Statements repeat the same (description, merchant) pairs heavily, so
+# classifier results are memoized for the run
+classify = functools.lru_cache(maxsize=100_000)(rule_based_category)
+
+
+@functools.lru_cache(maxsize=None)
+def category_name(category) -> str:
+    """Stored category (enum member or plain string) as its display name"""
+    if hasattr(category, 'value'):
+        return category.value
+    return str(category) if category else 'Unknown'
+
+
 def recategorize_transactions(user_id: str = None):
     """
     Recategorize transactions using updated classifier rules
@@ -27,58 +52,52 @@ def recategorize_transactions(user_id: str = None):
     session = db.get_session()
     
     try:
-        # Build query
-        query = session.query(Transaction)
+        # Build query: only the columns the classifier needs, as plain rows
+        query = select(
+            Transaction.transaction_id,
+            Transaction.description_raw,
+            Transaction.clean_description,
+            Transaction.merchant_canonical,
+            Transaction.merchant_raw,
+            Transaction.category
+        )
         if user_id:
-            query = query.filter(Transaction.user_id == user_id)
+            query = query.where(Transaction.user_id == user_id)
         
-        transactions = query.all()
-        print(f"Found {len(transactions)} transactions to recategorize")
+        rows = session.execute(query.execution_options(yield_per=FETCH_BATCH_SIZE))
         
+        total_count = 0
         updated_count = 0
         category_changes = {}
+        updates = []
         
-        for txn in transactions:
+        for txn in rows:
+            total_count += 1
+            
             # Get description and merchant
             description = txn.description_raw or txn.clean_description or ''
             merchant = txn.merchant_canonical or txn.merchant_raw or ''
             
-            # Get old category
-            old_category = txn.category
-            if hasattr(old_category, 'value'):
-                old_category_str = old_category.value
-            else:
-                old_category_str = str(old_category) if old_category else 'Unknown'
-            
             # Categorize using updated rules
-            new_category_str, sub_type = rule_based_category(description, merchant)
-            
-            # Map to TransactionCategory enum if needed
-            try:
-                # Try to find matching enum
-                new_category_enum = None
-                for cat in TransactionCategory:
-                    if cat.value == new_category_str or cat.value.lower() == new_category_str.lower():
-                        new_category_enum = cat
-                        break
-                
-                # If no match, use default
-                if not new_category_enum:
-                    if new_category_str == 'Shopping':
-                        new_category_enum = TransactionCategory.SHOPPING
-                    elif new_category_str == 'Food':
-                        new_category_enum = TransactionCategory.FOOD_DINING
-                    else:
-                        # Try to find closest match or use OTHER
-                        new_category_enum = TransactionCategory.OTHER
-            except:
-                new_category_enum = TransactionCategory.OTHER
+            new_category_str, sub_type = classify(description, merchant)
             
-            # Update if category changed
+            # Skip unchanged rows before any enum mapping
+            old_category_str = category_name(txn.category)
             if old_category_str != new_category_str:
-                txn.category = new_category_enum.value  # Store as enum value
+                # Map to TransactionCategory enum (unknown names become OTHER)
+                category_key = new_category_str.lower()
+                new_category_enum = (
+                    CATEGORY_BY_NAME.get(category_key)
+                    or CATEGORY_ALIASES.get(category_key, TransactionCategory.OTHER)
+                )
+                
+                update = {
+                    'transaction_id': txn.transaction_id,
+                    'category': new_category_enum.value  # Store as enum value
+                }
                 if sub_type:
-                    txn.transaction_sub_type = sub_type
+                    update['transaction_sub_type'] = sub_type
+                updates.append(update)
                 
                 updated_count += 1
                 change_key = f"{old_category_str} -> {new_category_str}"
@@ -89,6 +108,11 @@ def recategorize_transactions(user_id: str = None):
                     print(f"    Merchant: {merchant[:50]}")
                     print(f"    Description: {description[:60]}")
         
+        print(f"Found {total_count} transactions to recategorize")
+        
+        # Apply all changes as batched bulk UPDATEs in one transaction
+        for start in range(0, len(updates), UPDATE_BATCH_SIZE):
+            session.bulk_update_mappings(Transaction, updates[start:start + UPDATE_BATCH_SIZE])
         session.commit()
         
         print(f"\n✅ Recategorized {updated_count} transactions")
@@ -14,10 +14,12 @@ import os
 sys.path.insert(0, str(Path(__file__).parent))
 
 from storage.database import DatabaseManager
-from storage.models import User, Account, Base
+from storage.models import (
+    User, Account, BankTransaction, CreditCardTransaction, CreditCardStatement
+)
 from auth.password import hash_password
 from config import Config
-from sqlalchemy import text
+from sqlalchemy import select, delete, insert
 import uuid
 import logging
 import shutil
@@ -26,8 +28,12 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def reset_and_setup():
-    """Reset database and create test user"""
+def reset_and_setup(db: DatabaseManager = None):
+    """Reset database and create test user
+
+    Pass an existing DatabaseManager to reuse its engine; otherwise one is
+    created here and closed when setup finishes.
+    """
     
     script_dir = Path(__file__).parent
     db_path = script_dir / "data/finance.db"
@@ -36,6 +42,10 @@ def reset_and_setup():
     print("Runway Finance: Database Reset and Test User Setup")
     print("="*60)
     
+    # Release pooled connections to the old file before it is moved away
+    if db is not None:
+        db.engine.dispose()
+    
     # Remove old database if exists
     if db_path.exists():
         print("\n🗑️  Removing old database...")
@@ -54,45 +64,16 @@ def reset_and_setup():
     # Create data directory if it doesn't exist
     (script_dir / "data").mkdir(exist_ok=True)
     
-    # Initialize new database
-    db = DatabaseManager(Config.DATABASE_URL)
+    # Initialize new database (creates all tables and indexes)
+    owns_db = db is None
+    if owns_db:
+        db = DatabaseManager(Config.DATABASE_URL)
+    else:
+        db.create_schema()
     
     try:
-        # Create all tables with new schema
-        Base.metadata.create_all(bind=db.engine)
-        
-        # Create unique constraint for transactions (for duplicate prevention)
-        # Includes balance to differentiate same transaction at different times in the day
-        # Uses COALESCE to normalize NULL balance to sentinel value (-999999999.99)
-        # SQLite UNIQUE constraint treats NULL as distinct, so we normalize NULLs
-        session = db.get_session()
-        try:
-            # Drop existing index if it exists (without COALESCE)
-            try:
-                session.execute(text("DROP INDEX IF EXISTS idx_transaction_unique"))
-                session.commit()
-            except:
-                pass
-            
-            # Create new unique index with COALESCE to handle NULL balance
-            session.execute(text("""
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_transaction_unique 
-                ON transactions(
-                    user_id, 
-                    account_id, 
-                    date, 
-                    amount, 
-                    description_raw, 
-                    COALESCE(balance, -999999999.99)
-                )
-            """))
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            print(f"⚠️  Warning: Could not create unique constraint: {e}")
-        finally:
-            session.close()
-        
+        # DatabaseManager already ran create_all, which also builds the
+        # duplicate-prevention unique indexes declared on the models
         print("✅ Database created successfully!")
         
         # Now create test user
@@ -106,18 +87,16 @@ def reset_and_setup():
         session = db.get_session()
         
         try:
-            # Ensure no duplicate test user - delete related records first
-            existing_user = session.query(User).filter(User.email == email).first()
-            if existing_user:
-                from storage.models import Account, Transaction
-                user_id = existing_user.user_id
-                # Delete related transactions first (cascading should handle this, but being explicit)
-                session.query(Transaction).filter(Transaction.user_id == user_id).delete()
-                # Delete related accounts
-                session.query(Account).filter(Account.user_id == user_id).delete()
-                session.commit()
-                # Now delete the user
-                session.query(User).filter(User.email == email).delete()
+            # Ensure no duplicate test user - look up just its id (no ORM load)
+            existing_user_id = session.execute(
+                select(User.user_id).where(User.email == email)
+            ).scalar()
+            if existing_user_id:
+                # Delete related records first (bulk DELETEs skip ORM cascades),
+                # then the user, in one transaction
+                for model in (BankTransaction, CreditCardTransaction, CreditCardStatement, Account):
+                    session.execute(delete(model).where(model.user_id == existing_user_id))
+                session.execute(delete(User).where(User.user_id == existing_user_id))
                 session.commit()
 
             user = User(
@@ -164,39 +143,25 @@ def reset_and_setup():
                 }
             ]
             
-            created_accounts = []
-            for acc_data in sample_accounts:
-                try:
-                    # Get current_balance if provided, otherwise use 0.0 as default
-                    current_balance = acc_data.get("current_balance", 0.0)
-                    
-                    account = Account(
-                        account_id=str(uuid.uuid4()),
-                        user_id=user.user_id,  # Link account to test user
-                        account_name=acc_data["account_name"],
-                        bank_name=acc_data["bank_name"],
-                        account_type=acc_data["account_type"],
-                        current_balance=current_balance,  # Default to 0.0 if not provided
-                        account_number_ref=acc_data["account_number_ref"],
-                        currency="INR",
-                        is_active=True
-                    )
-                    session.add(account)
-                    created_accounts.append(account)
-                    
-                    # Format balance for display
-                    balance_str = f"₹{current_balance:,.2f}"
-                    print(f"   ✅ {acc_data['bank_name']} - {acc_data['account_name']} ({balance_str})")
-                except Exception as e:
-                    print(f"   ⚠️  Failed to create {acc_data['account_name']}: {e}")
-                    import traceback
-                    traceback.print_exc()
-            
+            # Insert all sample accounts in one executemany
+            created_accounts = [
+                {
+                    "account_id": str(uuid.uuid4()),
+                    "user_id": user.user_id,  # Link account to test user
+                    **acc_data,
+                    "current_balance": acc_data.get("current_balance", 0.0),  # Default to 0.0 if not provided
+                    "currency": "INR",
+                    "is_active": True
+                }
+                for acc_data in sample_accounts
+            ]
+            session.execute(insert(Account), created_accounts)
             session.commit()
             
-            # Refresh accounts to get IDs
             for account in created_accounts:
-                session.refresh(account)
+                # Format balance for display
+                balance_str = f"₹{account['current_balance']:,.2f}"
+                print(f"   ✅ {account['bank_name']} - {account['account_name']} ({balance_str})")
             
             print(f"✅ Created {len(created_accounts)} sample accounts!")
             
@@ -232,7 +197,8 @@ def reset_and_setup():
         logger.error(f"Error details: {e}", exc_info=True)
         return False
     finally:
-        db.close()
+        if owns_db:
+            db.close()
 
 
 if __name__ == "__main__":
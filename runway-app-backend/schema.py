@@ -5,14 +5,34 @@ This is the single source of truth for all transaction data in the application.
 All parsers (PDF, CSV, AA) must convert to this schema.
 """
 
-from dataclasses import dataclass, asdict, field
-from typing import Optional, Dict, Any, List
+from dataclasses import dataclass, field, fields
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 from enum import Enum
 import uuid
 import hashlib
+import functools
 import json
 
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Encodes dataclasses straight to JSON bytes (no intermediate dict);
+# str() stands in for types JSON can't represent, like json's default=str
+_ENCODER = msgspec.json.Encoder(enc_hook=str) if MSGSPEC_AVAILABLE else None
+
+# Both accept str or bytes
+_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
 
 class TransactionType(Enum):
     """Transaction type enumeration"""
@@ -40,7 +60,18 @@ class Category(Enum):
     UNKNOWN = "Unknown"
 
 
-@dataclass
+# Membership sets for the per-transaction checks
+_CATEGORY_VALUES = frozenset(cat.value for cat in Category)
+_VALID_TYPES = frozenset(('debit', 'credit'))
+
+
+@functools.lru_cache(maxsize=4096)
+def _merchant_id(merchant_canonical: str) -> str:
+    """Deterministic merchant ID (cached: batches repeat the same few merchants)"""
+    return hashlib.sha256(merchant_canonical.lower().encode()).hexdigest()[:16]
+
+
+@dataclass(slots=True)
 class CanonicalTransaction:
     """
     Canonical transaction schema - single source of truth
@@ -116,25 +147,34 @@ class CanonicalTransaction:
             raise ValueError(f"Amount must be positive: {self.amount}")
 
         # Validate type
-        if self.type not in ['debit', 'credit']:
+        if self.type not in _VALID_TYPES:
             raise ValueError(f"Type must be 'debit' or 'credit': {self.type}")
 
         # Normalize category
-        if self.category not in [cat.value for cat in Category]:
+        if self.category not in _CATEGORY_VALUES:
             self.category = "Unknown"
 
-    @staticmethod
-    def _generate_merchant_id(merchant_canonical: str) -> str:
-        """Generate deterministic merchant ID from canonical name"""
-        return hashlib.sha256(merchant_canonical.lower().encode()).hexdigest()[:16]
+    # Generate deterministic merchant ID from canonical name
+    _generate_merchant_id = staticmethod(_merchant_id)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
-        return asdict(self)
-
-    def to_json(self) -> str:
-        """Convert to JSON string"""
-        return json.dumps(self.to_dict(), indent=2, default=str)
+        data = {name: getattr(self, name) for name in _FIELD_NAMES}
+        # Copy the mutable fields so the dict doesn't alias this transaction
+        data['labels'] = list(self.labels)
+        data['metadata'] = dict(self.metadata)
+        return data
+
+    def to_json(self, pretty: bool = False) -> str:
+        """Convert to JSON string (compact unless pretty=True)"""
+        if _ENCODER is not None:
+            data = _ENCODER.encode(self)
+            if pretty:
+                data = msgspec.json.format(data, indent=2)
+            return data.decode()
+        if pretty:
+            return json.dumps(self.to_dict(), indent=2, default=str)
+        return json.dumps(self.to_dict(), default=str, separators=(',', ':'))
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CanonicalTransaction':
@@ -150,9 +190,9 @@ class CanonicalTransaction:
         return cls(**data)
 
     @classmethod
-    def from_json(cls, json_str: str) -> 'CanonicalTransaction':
-        """Create from JSON string"""
-        return cls.from_dict(json.loads(json_str))
+    def from_json(cls, json_str: Union[str, bytes]) -> 'CanonicalTransaction':
+        """Create from JSON string (or raw UTF-8 bytes)"""
+        return cls.from_dict(_loads(json_str))
 
     def validate(self) -> bool:
         """Validate transaction data"""
@@ -168,7 +208,7 @@ class CanonicalTransaction:
         if self.amount <= 0:
             errors.append(f"amount must be positive: {self.amount}")
 
-        if self.type not in ['debit', 'credit']:
+        if self.type not in _VALID_TYPES:
             errors.append(f"type must be 'debit' or 'credit': {self.type}")
 
         # Date format validation
@@ -190,6 +230,10 @@ class CanonicalTransaction:
                 f"category={self.category})")
 
 
+# Field names, resolved once instead of on every to_dict() call
+_FIELD_NAMES = tuple(f.name for f in fields(CanonicalTransaction))
+
+
 # Utility functions
 
 def create_transaction(
@@ -261,7 +305,7 @@ if __name__ == "__main__":
     print("Sample Transaction:")
     print(txn)
     print("\nJSON representation:")
-    print(txn.to_json())
+    print(txn.to_json(pretty=True))
 
     # Validate
     try:
@@ -6,11 +6,14 @@ Separates database operations from business logic.
 """
 
 import logging
+import time
 import uuid
-from typing import List, Optional, Dict, Any
+import weakref
+from typing import List, Optional, Dict, Any, Iterator, Sequence, Tuple, Union
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.engine import Row
+from sqlalchemy import and_, or_, func, insert, update, select, bindparam
 
 from storage.database import DatabaseManager
 from storage.models import (
@@ -18,9 +21,58 @@ from storage.models import (
     TransactionType, TransactionSource, TransactionCategory
 )
 from schema import CanonicalTransaction
+from utils.ids import gen_uuids
 
 logger = logging.getLogger(__name__)
 
+# Accepted source spellings (lowercase) -> stored TransactionSource value
+_SOURCE_MAP = {
+    'pdf': TransactionSource.PDF.value,
+    'pdf_upload': TransactionSource.PDF.value,
+    'csv': TransactionSource.CSV.value,
+    'csv_upload': TransactionSource.CSV.value,
+    'excel': TransactionSource.EXCEL.value,
+    'excel_upload': TransactionSource.EXCEL.value,
+    'aa': TransactionSource.AA.value,
+    'account_aggregator': TransactionSource.AA.value,
+    'api': TransactionSource.API.value,
+    'api_upload': TransactionSource.API.value,
+    'manual': TransactionSource.MANUAL.value,
+    'manually': TransactionSource.MANUAL.value,
+}
+
+
+# Column name -> mapped attribute, for column-projected queries
+_COL_ATTRS = {
+    attr.key: getattr(BankTransaction, attr.key)
+    for attr in BankTransaction.__mapper__.column_attrs
+}
+
+
+# Built once: the per-insert account type check reuses the statement and its
+# cached compiled form instead of rebuilding a Query each call
+_ACCOUNT_TYPE_STMT = select(Account.account_type).where(
+    Account.account_id == bindparam('account_id')
+)
+
+# Per-engine cache: account_id -> (expires_at, account_type). Account types are
+# fixed when the account is created, so the TTL only bounds how long a removed
+# account lingers
+_ACCOUNT_TYPE_TTL = 60.0
+_ACCOUNT_TYPE_CACHE_MAX = 10_000
+_account_type_caches = weakref.WeakKeyDictionary()
+
+
+def _normalize_sources_batch(sources: List[Any]) -> List[str]:
+    """Batch form of _get_source_value: one pass, no per-row method calls"""
+    manual = TransactionSource.MANUAL.value
+    return [
+        _SOURCE_MAP.get(s.lower(), manual) if isinstance(s, str)
+        else s.value if isinstance(s, TransactionSource)
+        else manual
+        for s in sources
+    ]
+
 
 class BankTransactionRepository:
     """
@@ -42,6 +94,19 @@ class BankTransactionRepository:
         """Get database session"""
         return self.db_manager.get_session()
     
+    def _account_type_cache(self) -> Dict[str, Tuple[float, Optional[str]]]:
+        """In-process account type cache for this repository's database"""
+        return _account_type_caches.setdefault(self.db_manager.engine, {})
+    
+    def _remember_account_types(self, account_types: Dict[str, Optional[str]]):
+        """Store looked-up account types in the in-process cache"""
+        cache = self._account_type_cache()
+        if len(cache) + len(account_types) > _ACCOUNT_TYPE_CACHE_MAX:
+            cache.clear()
+        expires_at = time.monotonic() + _ACCOUNT_TYPE_TTL
+        for account_id, account_type in account_types.items():
+            cache[account_id] = (expires_at, account_type)
+    
     def _get_source_value(self, source_value):
         """
         Convert source value to proper format (ENUM value or string)
@@ -57,29 +122,95 @@ class BankTransactionRepository:
         if isinstance(source_value, TransactionSource):
             return source_value.value
         if isinstance(source_value, str):
-            source_lower = source_value.lower()
-            if source_lower in ['pdf', 'pdf_upload']:
-                return TransactionSource.PDF.value
-            elif source_lower in ['csv', 'csv_upload']:
-                return TransactionSource.CSV.value
-            elif source_lower in ['excel', 'excel_upload']:
-                return TransactionSource.EXCEL.value
-            elif source_lower in ['aa', 'account_aggregator']:
-                return TransactionSource.AA.value
-            elif source_lower in ['api', 'api_upload']:
-                return TransactionSource.API.value
-            elif source_lower in ['manual', 'manually']:
-                return TransactionSource.MANUAL.value
-            else:
-                return TransactionSource.MANUAL.value
+            return _SOURCE_MAP.get(source_value.lower(), TransactionSource.MANUAL.value)
         return TransactionSource.MANUAL.value
     
+    @staticmethod
+    def _check_not_credit_card(account_id: str, account_type: Optional[str]):
+        """Reject credit card accounts (they belong to CreditCardTransactionRepository)"""
+        if account_type and account_type.lower() in ('credit_card', 'credit'):
+            raise ValueError(
+                f"Account {account_id} is a credit card account. "
+                "Use CreditCardTransactionRepository instead."
+            )
+    
+    def _build_txn_mapping(
+        self,
+        transaction_dict: dict,
+        user_id: str,
+        account_id: Optional[str] = None,
+        source: Optional[str] = None,
+        transaction_id: Optional[str] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the column values for one bank transaction
+        
+        Args:
+            transaction_dict: Transaction data dictionary (not modified)
+            user_id: User ID for the transaction
+            account_id: Optional account ID
+            source: Already-normalized source value (computed from the
+                dictionary's 'source' when omitted)
+            transaction_id: Pre-generated ID for a dictionary without one
+            now: Ingestion timestamp for a dictionary without one
+            
+        Returns:
+            Dictionary of BankTransaction column values
+        """
+        # Normalize date
+        txn_date = transaction_dict.get('date', '')
+        if not txn_date:
+            txn_date = datetime.now().strftime('%Y-%m-%d')
+        
+        return {
+            'transaction_id': transaction_dict.get('transaction_id') or transaction_id or str(uuid.uuid4()),
+            'user_id': user_id,
+            'account_id': account_id or transaction_dict.get('account_id'),
+            'date': txn_date,
+            'timestamp': transaction_dict.get('timestamp'),
+            'amount': transaction_dict.get('amount', 0.0),
+            'type': transaction_dict.get('type', TransactionType.DEBIT),
+            'description_raw': transaction_dict.get('description_raw') or transaction_dict.get('remark') or transaction_dict.get('raw_remark'),
+            'clean_description': transaction_dict.get('clean_description') or transaction_dict.get('description'),
+            'merchant_raw': transaction_dict.get('merchant_raw') or transaction_dict.get('merchant'),
+            'merchant_canonical': transaction_dict.get('merchant_canonical'),
+            'merchant_id': transaction_dict.get('merchant_id'),
+            'category': transaction_dict.get('category', TransactionCategory.UNKNOWN),
+            'transaction_sub_type': transaction_dict.get('transaction_sub_type') or transaction_dict.get('sub_type'),
+            'labels': transaction_dict.get('labels'),
+            'confidence': transaction_dict.get('confidence'),
+            'balance': transaction_dict.get('balance'),
+            'transaction_reference': transaction_dict.get('transaction_reference') or transaction_dict.get('reference'),
+            'cheque_number': transaction_dict.get('cheque_number'),
+            'branch_code': transaction_dict.get('branch_code'),
+            'ifsc_code': transaction_dict.get('ifsc_code'),
+            'currency': transaction_dict.get('currency', 'INR'),
+            'original_amount': transaction_dict.get('original_amount'),
+            'original_currency': transaction_dict.get('original_currency'),
+            'duplicate_of': transaction_dict.get('duplicate_of'),
+            'duplicate_count': transaction_dict.get('duplicate_count', 0),
+            'is_duplicate': transaction_dict.get('is_duplicate', False),
+            'source': source if source is not None else self._get_source_value(transaction_dict.get('source')),
+            'bank_name': transaction_dict.get('bank_name'),
+            'statement_period': transaction_dict.get('statement_period'),
+            'ingestion_timestamp': transaction_dict.get('ingestion_timestamp') or now or datetime.now(),
+            'extra_metadata': transaction_dict.get('extra_metadata'),
+            'linked_asset_id': transaction_dict.get('linked_asset_id'),
+            'liquidation_event_id': transaction_dict.get('liquidation_event_id'),
+            'month': transaction_dict.get('month') or txn_date[:7],  # YYYY-MM
+            'is_recurring': transaction_dict.get('is_recurring', False),
+            'recurring_type': transaction_dict.get('recurring_type'),
+            'recurring_group_id': transaction_dict.get('recurring_group_id')
+        }
+    
     def create_transaction(
         self,
         transaction_dict: dict,
         user_id: str,
         account_id: Optional[str] = None,
-        session: Optional[Session] = None
+        session: Optional[Session] = None,
+        prevalidated_accounts: Optional[Dict[str, Optional[str]]] = None
     ) -> BankTransaction:
         """
         Create a bank transaction in database
@@ -89,6 +220,8 @@ class BankTransactionRepository:
             user_id: User ID for the transaction
             account_id: Optional account ID
             session: Existing database session (if None, creates new)
+            prevalidated_accounts: Optional account_id -> account_type map
+                already loaded by the caller; skips the account lookup
             
         Returns:
             Created BankTransaction model instance
@@ -99,66 +232,25 @@ class BankTransactionRepository:
             session = self._get_session()
         
         try:
-            # Normalize date
-            txn_date = transaction_dict.get('date', '')
-            if not txn_date:
-                txn_date = datetime.now().strftime('%Y-%m-%d')
-            
             # Validate account type if account_id provided
             if account_id:
-                account = session.query(Account).filter(
-                    Account.account_id == account_id
-                ).first()
-                
-                if account and account.account_type:
-                    account_type = account.account_type.lower()
-                    if account_type in ['credit_card', 'credit']:
-                        raise ValueError(
-                            f"Account {account_id} is a credit card account. "
-                            "Use CreditCardTransactionRepository instead."
-                        )
+                if prevalidated_accounts is not None and account_id in prevalidated_accounts:
+                    account_type = prevalidated_accounts[account_id]
+                else:
+                    # Not prevalidated: TTL cache first, then the database
+                    cached = self._account_type_cache().get(account_id)
+                    if cached is not None and cached[0] > time.monotonic():
+                        account_type = cached[1]
+                    else:
+                        account_type = session.execute(
+                            _ACCOUNT_TYPE_STMT, {'account_id': account_id}
+                        ).scalar()
+                        if account_type is not None:
+                            self._remember_account_types({account_id: account_type})
+                self._check_not_credit_card(account_id, account_type)
             
             # Build transaction object
-            txn = BankTransaction(
-                transaction_id=transaction_dict.get('transaction_id') or str(uuid.uuid4()),
-                user_id=user_id,
-                account_id=account_id or transaction_dict.get('account_id'),
-                date=txn_date,
-                timestamp=transaction_dict.get('timestamp'),
-                amount=transaction_dict.get('amount', 0.0),
-                type=transaction_dict.get('type', TransactionType.DEBIT),
-                description_raw=transaction_dict.get('description_raw') or transaction_dict.get('remark') or transaction_dict.get('raw_remark'),
-                clean_description=transaction_dict.get('clean_description') or transaction_dict.get('description'),
-                merchant_raw=transaction_dict.get('merchant_raw') or transaction_dict.get('merchant'),
-                merchant_canonical=transaction_dict.get('merchant_canonical'),
-                merchant_id=transaction_dict.get('merchant_id'),
-                category=transaction_dict.get('category', TransactionCategory.UNKNOWN),
-                transaction_sub_type=transaction_dict.get('transaction_sub_type') or transaction_dict.get('sub_type'),
-                labels=transaction_dict.get('labels'),
-                confidence=transaction_dict.get('confidence'),
-                balance=transaction_dict.get('balance'),
-                transaction_reference=transaction_dict.get('transaction_reference') or transaction_dict.get('reference'),
-                cheque_number=transaction_dict.get('cheque_number'),
-                branch_code=transaction_dict.get('branch_code'),
-                ifsc_code=transaction_dict.get('ifsc_code'),
-                currency=transaction_dict.get('currency', 'INR'),
-                original_amount=transaction_dict.get('original_amount'),
-                original_currency=transaction_dict.get('original_currency'),
-                duplicate_of=transaction_dict.get('duplicate_of'),
-                duplicate_count=transaction_dict.get('duplicate_count', 0),
-                is_duplicate=transaction_dict.get('is_duplicate', False),
-                source=self._get_source_value(transaction_dict.get('source')),
-                bank_name=transaction_dict.get('bank_name'),
-                statement_period=transaction_dict.get('statement_period'),
-                ingestion_timestamp=transaction_dict.get('ingestion_timestamp', datetime.now()),
-                extra_metadata=transaction_dict.get('extra_metadata'),
-                linked_asset_id=transaction_dict.get('linked_asset_id'),
-                liquidation_event_id=transaction_dict.get('liquidation_event_id'),
-                month=transaction_dict.get('month') or txn_date[:7],  # YYYY-MM
-                is_recurring=transaction_dict.get('is_recurring', False),
-                recurring_type=transaction_dict.get('recurring_type'),
-                recurring_group_id=transaction_dict.get('recurring_group_id')
-            )
+            txn = BankTransaction(**self._build_txn_mapping(transaction_dict, user_id, account_id))
             
             session.add(txn)
             
@@ -214,6 +306,71 @@ class BankTransactionRepository:
             if close_session:
                 session.close()
     
+    def _transactions_query(
+        self,
+        session: Session,
+        user_id: str,
+        account_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        keyset: bool = False,
+        after_date: Optional[str] = None,
+        after_id: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None
+    ):
+        """Build the filtered, ordered query behind get_transactions/iter_transactions"""
+        if columns:
+            unknown = [c for c in columns if c not in _COL_ATTRS]
+            if unknown:
+                raise ValueError(f"Unknown bank transaction columns: {unknown}")
+            query = session.query(*[_COL_ATTRS[c] for c in columns])
+        else:
+            query = session.query(BankTransaction)
+        
+        query = query.filter(
+            BankTransaction.user_id == user_id
+        )
+        
+        if account_id:
+            query = query.filter(BankTransaction.account_id == account_id)
+        
+        if start_date:
+            query = query.filter(BankTransaction.date >= start_date)
+        
+        if end_date:
+            query = query.filter(BankTransaction.date <= end_date)
+        
+        if category:
+            query = query.filter(BankTransaction.category == category)
+        
+        if transaction_type:
+            query = query.filter(BankTransaction.type == transaction_type)
+        
+        if keyset or after_date is not None:
+            if after_id is not None:
+                query = query.filter(or_(
+                    BankTransaction.date < after_date,
+                    and_(BankTransaction.date == after_date,
+                         BankTransaction.transaction_id < after_id)
+                ))
+            elif after_date is not None:
+                query = query.filter(BankTransaction.date < after_date)
+            query = query.order_by(BankTransaction.date.desc(), BankTransaction.transaction_id.desc())
+        else:
+            query = query.order_by(BankTransaction.date.desc(), BankTransaction.timestamp.desc().nulls_last())
+        
+            if offset:
+                query = query.offset(offset)
+        
+        if limit:
+            query = query.limit(limit)
+        
+        return query
+    
     def get_transactions(
         self,
         user_id: str,
@@ -224,11 +381,19 @@ class BankTransactionRepository:
         transaction_type: Optional[str] = None,
         limit: Optional[int] = None,
         offset: Optional[int] = None,
+        keyset: bool = False,
+        after_date: Optional[str] = None,
+        after_id: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
         session: Optional[Session] = None
-    ) -> List[BankTransaction]:
+    ) -> Union[List[BankTransaction], List[Row]]:
         """
         Get bank transactions with filters
         
+        Keyset pagination orders rows by (date, transaction_id) descending and
+        continues after a cursor instead of skipping `offset` rows. The cursor
+        for the next page is the last row's (date, transaction_id).
+        
         Args:
             user_id: User ID (required)
             account_id: Optional account ID filter
@@ -237,11 +402,18 @@ class BankTransactionRepository:
             category: Optional category filter
             transaction_type: Optional type filter ('debit' or 'credit')
             limit: Optional limit for pagination
-            offset: Optional offset for pagination
+            offset: Optional offset for pagination (ignored for keyset pages)
+            keyset: Use keyset ordering (implied when a cursor is given)
+            after_date: Cursor date from the previous keyset page (alone:
+                start with rows dated before it)
+            after_id: Cursor transaction_id from the previous keyset page
+            columns: Optional column names to fetch instead of full objects
+                (e.g. ('date', 'amount', 'type', 'merchant_canonical'))
             session: Existing database session
             
         Returns:
-            List of BankTransaction instances
+            List of BankTransaction instances, or of named rows holding just
+            `columns` when given
         """
         close_session = session is None
         
@@ -249,34 +421,63 @@ class BankTransactionRepository:
             session = self._get_session()
         
         try:
-            query = session.query(BankTransaction).filter(
-                BankTransaction.user_id == user_id
+            query = self._transactions_query(
+                session, user_id, account_id, start_date, end_date, category,
+                transaction_type, limit, offset, keyset, after_date, after_id, columns
             )
             
-            if account_id:
-                query = query.filter(BankTransaction.account_id == account_id)
-            
-            if start_date:
-                query = query.filter(BankTransaction.date >= start_date)
-            
-            if end_date:
-                query = query.filter(BankTransaction.date <= end_date)
-            
-            if category:
-                query = query.filter(BankTransaction.category == category)
-            
-            if transaction_type:
-                query = query.filter(BankTransaction.type == transaction_type)
-            
-            query = query.order_by(BankTransaction.date.desc(), BankTransaction.timestamp.desc())
+            return query.all()
             
-            if offset:
-                query = query.offset(offset)
+        finally:
+            if close_session:
+                session.close()
+    
+    def iter_transactions(
+        self,
+        user_id: str,
+        account_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category: Optional[str] = None,
+        transaction_type: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 1000,
+        session: Optional[Session] = None
+    ) -> Iterator[Union[BankTransaction, Row]]:
+        """
+        Stream bank transactions with filters (for exports and full scans)
+        
+        Rows are fetched `batch_size` at a time from a server-side cursor where
+        the driver supports one, so memory stays bounded however many rows
+        match. Ordering and filters are the same as get_transactions.
+        
+        Args:
+            user_id: User ID (required)
+            account_id: Optional account ID filter
+            start_date: Optional start date (YYYY-MM-DD)
+            end_date: Optional end date (YYYY-MM-DD)
+            category: Optional category filter
+            transaction_type: Optional type filter ('debit' or 'credit')
+            columns: Optional column names to fetch instead of full objects
+            batch_size: Rows fetched per round trip
+            session: Existing database session (if None, one is held open
+                until the iterator is exhausted or closed)
             
-            if limit:
-                query = query.limit(limit)
+        Yields:
+            BankTransaction instances, or named rows when `columns` is given
+        """
+        close_session = session is None
+        
+        if close_session:
+            session = self._get_session()
+        
+        try:
+            query = self._transactions_query(
+                session, user_id, account_id, start_date, end_date, category,
+                transaction_type, columns=columns
+            )
             
-            return query.all()
+            yield from query.yield_per(batch_size)
             
         finally:
             if close_session:
@@ -287,7 +488,8 @@ class BankTransactionRepository:
         transaction_id: str,
         updates: dict,
         user_id: Optional[str] = None,
-        session: Optional[Session] = None
+        session: Optional[Session] = None,
+        updated_at: Optional[datetime] = None
     ) -> Optional[BankTransaction]:
         """
         Update bank transaction
@@ -297,6 +499,8 @@ class BankTransactionRepository:
             updates: Dictionary of fields to update
             user_id: Optional user ID for authorization
             session: Existing database session
+            updated_at: Modification time to stamp (defaults to now); lets
+                loops over many updates read the clock once
             
         Returns:
             Updated BankTransaction instance or None
@@ -324,7 +528,7 @@ class BankTransactionRepository:
                 if hasattr(txn, key):
                     setattr(txn, key, value)
             
-            txn.updated_at = datetime.now()
+            txn.updated_at = updated_at or datetime.now()
             
             if close_session:
                 session.commit()
@@ -342,6 +546,70 @@ class BankTransactionRepository:
             if close_session:
                 session.close()
     
+    def bulk_update_transactions(
+        self,
+        updates_list: List[dict],
+        user_id: str,
+        session: Optional[Session] = None
+    ) -> int:
+        """
+        Bulk update bank transactions
+        
+        Args:
+            updates_list: List of dictionaries, each with 'transaction_id' and
+                the fields to update (unknown fields are ignored)
+            user_id: User ID owning the transactions (others are skipped)
+            session: Existing database session
+            
+        Returns:
+            Number of transactions updated
+        """
+        close_session = session is None
+        
+        if close_session:
+            session = self._get_session()
+        
+        try:
+            # Only touch rows that belong to this user
+            requested_ids = {u['transaction_id'] for u in updates_list if u.get('transaction_id')}
+            owned_ids = set()
+            if requested_ids:
+                owned_ids = {
+                    txn_id for (txn_id,) in session.query(BankTransaction.transaction_id).filter(
+                        BankTransaction.user_id == user_id,
+                        BankTransaction.transaction_id.in_(requested_ids)
+                    )
+                }
+            
+            # One timestamp for the batch; primary-key UPDATEs sent together
+            now = datetime.now()
+            mappings = []
+            for updates in updates_list:
+                if updates.get('transaction_id') not in owned_ids:
+                    continue
+                mapping = {k: v for k, v in updates.items()
+                           if k in _COL_ATTRS and k != 'user_id'}
+                mapping['updated_at'] = now
+                mappings.append(mapping)
+            
+            if mappings:
+                session.execute(update(BankTransaction), mappings)
+            
+            if close_session:
+                session.commit()
+            
+            logger.info(f"Bulk updated {len(mappings)} bank transactions")
+            return len(mappings)
+            
+        except Exception as e:
+            if close_session:
+                session.rollback()
+            logger.error(f"Error bulk updating bank transactions: {e}")
+            raise
+        finally:
+            if close_session:
+                session.close()
+    
     def delete_transaction(
         self,
         transaction_id: str,
@@ -409,7 +677,7 @@ class BankTransactionRepository:
             session: Existing database session
             
         Returns:
-            List of created BankTransaction instances
+            List of created BankTransaction instances (not attached to the session)
         """
         close_session = session is None
         
@@ -417,19 +685,40 @@ class BankTransactionRepository:
             session = self._get_session()
         
         try:
-            created_txns = []
-            
-            for txn_dict in transactions:
-                txn = self.create_transaction(
-                    txn_dict,
-                    user_id,
-                    session=session
+            # One ingestion timestamp and one urandom read for the whole batch
+            now = datetime.now()
+            new_ids = gen_uuids(len(transactions))
+            
+            # Validate every referenced account with a single query
+            account_ids = {t['account_id'] for t in transactions if t.get('account_id')}
+            if account_ids:
+                account_types = dict(session.query(
+                    Account.account_id, Account.account_type
+                ).filter(Account.account_id.in_(account_ids)).all())
+                self._remember_account_types(account_types)
+                for acc_id, acc_type in account_types.items():
+                    self._check_not_credit_card(acc_id, acc_type)
+            
+            sources = _normalize_sources_batch([t.get('source') for t in transactions])
+            
+            mappings = []
+            for txn_dict, source, new_id in zip(transactions, sources, new_ids):
+                mapping = self._build_txn_mapping(
+                    txn_dict, user_id, source=source, transaction_id=new_id, now=now
                 )
-                created_txns.append(txn)
+                mapping['created_at'] = mapping['updated_at'] = now
+                mappings.append(mapping)
+            
+            # One executemany INSERT instead of per-row ORM objects and flushes
+            if mappings:
+                session.execute(insert(BankTransaction), mappings)
             
             if close_session:
                 session.commit()
             
+            # Unattached instances carrying the inserted values
+            created_txns = [BankTransaction(**mapping) for mapping in mappings]
+            
             logger.info(f"Bulk inserted {len(created_txns)} bank transactions")
             return created_txns
             
@@ -469,7 +758,12 @@ class BankTransactionRepository:
             session = self._get_session()
         
         try:
-            query = session.query(BankTransaction).filter(
+            # Count and sum per type in one pass over the filtered rows
+            query = session.query(
+                BankTransaction.type,
+                func.count().label('count'),
+                func.coalesce(func.sum(BankTransaction.amount), 0.0).label('total')
+            ).filter(
                 BankTransaction.user_id == user_id
             )
             
@@ -482,16 +776,16 @@ class BankTransactionRepository:
             if end_date:
                 query = query.filter(BankTransaction.date <= end_date)
             
-            total_count = query.count()
-            
-            debit_query = query.filter(BankTransaction.type == TransactionType.DEBIT)
-            credit_query = query.filter(BankTransaction.type == TransactionType.CREDIT)
-            
-            total_debit = debit_query.with_entities(func.sum(BankTransaction.amount)).scalar() or 0.0
-            total_credit = credit_query.with_entities(func.sum(BankTransaction.amount)).scalar() or 0.0
+            by_type = {}
+            total_count = 0
+            for txn_type, count, total in query.group_by(BankTransaction.type):
+                if isinstance(txn_type, TransactionType):
+                    txn_type = txn_type.value
+                by_type[txn_type] = (count, total)
+                total_count += count
             
-            debit_count = debit_query.count()
-            credit_count = credit_query.count()
+            debit_count, total_debit = by_type.get(TransactionType.DEBIT.value, (0, 0.0))
+            credit_count, total_credit = by_type.get(TransactionType.CREDIT.value, (0, 0.0))
             
             return {
                 'total_count': total_count,
@@ -5,16 +5,21 @@ Business logic for bank transaction operations.
 Handles validation, business rules, and orchestrates repository calls.
 """
 
+import base64
+import binascii
 import logging
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from storage.database import DatabaseManager
 from .bank_transaction_repository import BankTransactionRepository
-from storage.models import Account
+from storage.models import BankTransaction, row_to_dict
 
 logger = logging.getLogger(__name__)
 
+# Every column, fetched as plain rows for list endpoints
+_TXN_COLUMNS = tuple(attr.key for attr in BankTransaction.__mapper__.column_attrs)
+
 
 class BankTransactionService:
     """
@@ -49,25 +54,11 @@ class BankTransactionService:
             
         Returns:
             Created transaction dictionary
+            
+        Raises:
+            ValueError: If account_id is a credit card account
         """
-        # Validate account type if account_id provided
-        if account_id:
-            session = self.db_manager.get_session()
-            try:
-                account = session.query(Account).filter(
-                    Account.account_id == account_id
-                ).first()
-                
-                if account:
-                    account_type = account.account_type.lower() if account.account_type else None
-                    if account_type in ['credit_card', 'credit']:
-                        raise ValueError(
-                            f"Cannot create bank transaction for credit card account: {account_id}"
-                        )
-            finally:
-                session.close()
-        
-        # Create transaction via repository
+        # The repository rejects credit card accounts in the insert's own session
         txn = self.repository.create_transaction(
             transaction_data,
             user_id,
@@ -107,11 +98,17 @@ class BankTransactionService:
         category: Optional[str] = None,
         transaction_type: Optional[str] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        keyset: bool = False,
+        cursor: Optional[str] = None
     ) -> List[dict]:
         """
         Get bank transactions with filters
         
+        With keyset pagination (or a cursor) rows are ordered by date and
+        transaction_id descending and each page continues after the previous
+        page's last row, so deep pages cost the same as the first one.
+        
         Args:
             user_id: User ID (required)
             account_id: Optional account ID filter
@@ -120,11 +117,20 @@ class BankTransactionService:
             category: Optional category filter
             transaction_type: Optional type filter ('debit' or 'credit')
             limit: Optional limit for pagination
-            offset: Optional offset for pagination
+            offset: Optional offset for pagination (ignored for keyset pages)
+            keyset: Use keyset pagination (implied by cursor)
+            cursor: Cursor from next_cursor() for the previous page
             
         Returns:
             List of transaction dictionaries
+            
+        Raises:
+            ValueError: If cursor is malformed
         """
+        after_date = after_id = None
+        if cursor:
+            after_date, after_id = self._decode_cursor(cursor)
+        
         txns = self.repository.get_transactions(
             user_id=user_id,
             account_id=account_id,
@@ -133,10 +139,41 @@ class BankTransactionService:
             category=category,
             transaction_type=transaction_type,
             limit=limit,
-            offset=offset
+            offset=offset,
+            keyset=keyset or cursor is not None,
+            after_date=after_date,
+            after_id=after_id,
+            columns=_TXN_COLUMNS
         )
         
-        return [txn.to_dict() for txn in txns]
+        return [row_to_dict(txn) for txn in txns]
+    
+    @staticmethod
+    def next_cursor(transactions: List[dict], limit: Optional[int]) -> Optional[str]:
+        """
+        Cursor for the keyset page after `transactions`
+        
+        Args:
+            transactions: Transactions of the current keyset page
+            limit: Page size the page was fetched with
+            
+        Returns:
+            Opaque cursor string, or None when the page was the last one
+        """
+        if not transactions or not limit or len(transactions) < limit:
+            return None
+        last = transactions[-1]
+        raw = f"{last['date']}|{last['transaction_id']}".encode()
+        return base64.urlsafe_b64encode(raw).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Split a next_cursor() value back into (date, transaction_id)"""
+        try:
+            after_date, after_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise ValueError(f"Invalid pagination cursor: {cursor}")
+        return after_date, after_id
     
     def update_transaction(
         self,
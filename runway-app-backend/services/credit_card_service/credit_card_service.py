@@ -10,16 +10,55 @@ Handles credit card-specific operations:
 import logging
 import uuid
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime
 
+from sqlalchemy import Integer, String, case, cast, func, select
+
+from config import Config
+from storage import cache
 from storage.database import DatabaseManager
 from storage.models import (
-    Account, CreditCardStatement, Transaction, TransactionType, TransactionSource
+    Account, CreditCardStatement, CreditCardTransaction, TransactionType, TransactionSource,
+    row_to_dict
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _financial_year_expr(date_col):
+    """
+    SQL expression for the Indian financial year (Apr-Mar) of a YYYY-MM-DD string column
+    
+    Args:
+        date_col: String date column
+        
+    Returns:
+        Expression rendering e.g. '2024-2025' for any date from 2024-04-01 to 2025-03-31
+    """
+    year = cast(func.substr(date_col, 1, 4), Integer)
+    month = cast(func.substr(date_col, 6, 2), Integer)
+    fy_start = case((month >= 4, year), else_=year - 1)
+    return cast(fy_start, String) + '-' + cast(fy_start + 1, String)
+
+
+def _financial_year_range(financial_year: str) -> Optional[Tuple[str, str]]:
+    """
+    Half-open date range of a financial year label
+    
+    Args:
+        financial_year: '2024-2025' or '2024-25'
+        
+    Returns:
+        ('2024-04-01', '2025-04-01'), or None if the label is malformed
+    """
+    start, _, end = financial_year.partition('-')
+    if len(start) != 4 or not start.isdigit() or not end.isdigit():
+        return None
+    start_year = int(start)
+    if end not in (str(start_year + 1), f"{(start_year + 1) % 100:02d}"):
+        return None
+    return f"{start_year}-04-01", f"{start_year + 1}-04-01"
+
+
 class CreditCardService:
     """
     Business logic for credit card operations
@@ -51,73 +90,66 @@ class CreditCardService:
         Returns:
             Account ID if created/updated, None otherwise
         """
-        session = self.db_manager.get_session()
-        
         try:
-            card_last_4 = metadata.get('card_last_4_digits')
-            bank_name = metadata.get('bank_name')
-            customer_name = metadata.get('customer_name')
-            
-            if not bank_name:
-                logger.warning("No bank name in metadata, skipping account creation")
-                return None
-            
-            # Try to find existing credit card account
-            existing_account = session.query(Account).filter(
-                Account.user_id == user_id,
-                Account.account_type == 'credit_card',
-                Account.bank_name == bank_name
-            ).first()
-            
-            if card_last_4:
-                # More specific search if we have last 4 digits
-                existing_account = session.query(Account).filter(
-                    Account.user_id == user_id,
-                    Account.account_type == 'credit_card',
-                    Account.account_number_ref == card_last_4
-                ).first()
-            
-            if existing_account:
-                # Update existing account
-                logger.info(f"Updating existing credit card account: {existing_account.account_id}")
-                if not existing_account.account_name and customer_name:
-                    existing_account.account_name = customer_name
-                if not existing_account.account_number_ref and card_last_4:
-                    existing_account.account_number_ref = card_last_4
-                session.commit()
-                return existing_account.account_id
-            else:
-                # Create new credit card account
-                logger.info("Creating new credit card account")
-                new_account_id = str(uuid.uuid4())
-                
-                account_name = customer_name or f"{bank_name} Credit Card"
+            with self.db_manager.session_scope() as session:
+                card_last_4 = metadata.get('card_last_4_digits')
+                bank_name = metadata.get('bank_name')
+                customer_name = metadata.get('customer_name')
                 
-                new_account = Account(
-                    account_id=new_account_id,
-                    user_id=user_id,
-                    account_name=account_name,
-                    bank_name=bank_name,
-                    account_type='credit_card',
-                    account_number_ref=card_last_4,
-                    currency='INR',
-                    current_balance=0.0,
-                    is_active=True
-                )
+                if not bank_name:
+                    logger.warning("No bank name in metadata, skipping account creation")
+                    return None
                 
-                session.add(new_account)
-                session.commit()
-                session.refresh(new_account)
+                # Find existing credit card account: by card number when known
+                # (distinct cards of one bank are separate accounts), else by bank
+                if card_last_4:
+                    account_match = Account.account_number_ref == card_last_4
+                else:
+                    account_match = Account.bank_name == bank_name
                 
-                logger.info(f"Created credit card account: {new_account_id}")
-                return new_account_id
+                existing_account = session.execute(
+                    select(Account).where(
+                        Account.user_id == user_id,
+                        Account.account_type == 'credit_card',
+                        account_match
+                    ).limit(1)
+                ).scalars().first()
                 
+                if existing_account:
+                    # Update existing account
+                    logger.info(f"Updating existing credit card account: {existing_account.account_id}")
+                    if not existing_account.account_name and customer_name:
+                        existing_account.account_name = customer_name
+                    if not existing_account.account_number_ref and card_last_4:
+                        existing_account.account_number_ref = card_last_4
+                    return existing_account.account_id
+                else:
+                    # Create new credit card account
+                    logger.info("Creating new credit card account")
+                    new_account_id = str(uuid.uuid4())
+                    
+                    account_name = customer_name or f"{bank_name} Credit Card"
+                    
+                    new_account = Account(
+                        account_id=new_account_id,
+                        user_id=user_id,
+                        account_name=account_name,
+                        bank_name=bank_name,
+                        account_type='credit_card',
+                        account_number_ref=card_last_4,
+                        currency='INR',
+                        current_balance=0.0,
+                        is_active=True
+                    )
+                    
+                    session.add(new_account)
+            
+            logger.info(f"Created credit card account: {new_account_id}")
+            return new_account_id
+            
         except Exception as e:
-            session.rollback()
             logger.error(f"Error creating/updating credit card account: {e}", exc_info=True)
             return None
-        finally:
-            session.close()
     
     def create_credit_card_statement_record(
         self,
@@ -140,68 +172,62 @@ class CreditCardService:
         Returns:
             Statement ID if created, None otherwise
         """
-        session = self.db_manager.get_session()
-        
         try:
-            statement_id = str(uuid.uuid4())
-            
-            # Extract statement dates from metadata if available
-            statement_start = metadata.get('statement_start_date')
-            statement_end = metadata.get('statement_end_date')
-            billing_period = metadata.get('billing_period')
-            
-            # Try to infer from transactions if not in metadata
-            if not (statement_start and statement_end):
-                first_txn = session.query(Transaction).filter(
-                    Transaction.user_id == user_id,
-                    Transaction.account_id == account_id
-                ).order_by(Transaction.date.asc()).first()
+            with self.db_manager.session_scope() as session:
+                statement_id = str(uuid.uuid4())
                 
-                last_txn = session.query(Transaction).filter(
-                    Transaction.user_id == user_id,
-                    Transaction.account_id == account_id
-                ).order_by(Transaction.date.desc()).first()
+                # Extract statement dates from metadata if available
+                statement_start = metadata.get('statement_start_date')
+                statement_end = metadata.get('statement_end_date')
+                billing_period = metadata.get('billing_period')
                 
-                if first_txn and last_txn:
-                    statement_start = first_txn.date
-                    statement_end = last_txn.date
-            
-            new_statement = CreditCardStatement(
-                statement_id=statement_id,
-                user_id=user_id,
-                account_id=account_id,
-                bank_name=metadata.get('bank_name', 'Unknown'),
-                card_number_masked=metadata.get('card_number'),
-                card_last_4_digits=metadata.get('card_last_4_digits'),
-                customer_name=metadata.get('customer_name'),
-                statement_start_date=statement_start,
-                statement_end_date=statement_end,
-                billing_period=billing_period,
-                total_transactions=metadata.get('transaction_count', 0),
-                source_file=filename,
-                source_type=source_type,
-                is_processed=True,
-                processing_status='completed',
-                extra_metadata={
-                    'card_holder_address': metadata.get('card_holder_address'),
-                    'rewards_info': metadata.get('rewards_info')
-                },
-                transactions_processed=metadata.get('transaction_count', 0)
-            )
-            
-            session.add(new_statement)
-            session.commit()
-            session.refresh(new_statement)
+                # Try to infer from transactions if not in metadata
+                if not (statement_start and statement_end):
+                    first_date, last_date = session.execute(
+                        select(
+                            func.min(CreditCardTransaction.date),
+                            func.max(CreditCardTransaction.date)
+                        ).where(
+                            CreditCardTransaction.user_id == user_id,
+                            CreditCardTransaction.account_id == account_id
+                        )
+                    ).one()
+                    
+                    if first_date and last_date:
+                        statement_start = first_date
+                        statement_end = last_date
+                
+                new_statement = CreditCardStatement(
+                    statement_id=statement_id,
+                    user_id=user_id,
+                    account_id=account_id,
+                    bank_name=metadata.get('bank_name', 'Unknown'),
+                    card_number_masked=metadata.get('card_number'),
+                    card_last_4_digits=metadata.get('card_last_4_digits'),
+                    customer_name=metadata.get('customer_name'),
+                    statement_start_date=statement_start,
+                    statement_end_date=statement_end,
+                    billing_period=billing_period,
+                    total_transactions=metadata.get('transaction_count', 0),
+                    source_file=filename,
+                    source_type=source_type,
+                    is_processed=True,
+                    processing_status='completed',
+                    extra_metadata={
+                        'card_holder_address': metadata.get('card_holder_address'),
+                        'rewards_info': metadata.get('rewards_info')
+                    },
+                    transactions_processed=metadata.get('transaction_count', 0)
+                )
+                
+                session.add(new_statement)
             
             logger.info(f"Created credit card statement record: {statement_id}")
             return statement_id
             
         except Exception as e:
-            session.rollback()
             logger.error(f"Error creating credit card statement: {e}", exc_info=True)
             return None
-        finally:
-            session.close()
     
     def get_credit_card_statements(
         self,
@@ -218,22 +244,21 @@ class CreditCardService:
         Returns:
             List of statement dictionaries
         """
-        session = self.db_manager.get_session()
-        
         try:
-            statements = session.query(CreditCardStatement).filter(
-                CreditCardStatement.user_id == user_id
-            ).order_by(
-                CreditCardStatement.created_at.desc()
-            ).limit(limit).all()
-            
-            return [stmt.to_dict() for stmt in statements]
-            
+            with self.db_manager.session_scope() as session:
+                statements = session.execute(
+                    select(CreditCardStatement.__table__).where(
+                        CreditCardStatement.user_id == user_id
+                    ).order_by(
+                        CreditCardStatement.created_at.desc()
+                    ).limit(limit)
+                )
+                
+                return [row_to_dict(stmt) for stmt in statements]
+                
         except Exception as e:
             logger.error(f"Error fetching credit card statements: {e}", exc_info=True)
             return []
-        finally:
-            session.close()
     
     def get_credit_card_accounts(
         self,
@@ -248,21 +273,20 @@ class CreditCardService:
         Returns:
             List of account dictionaries
         """
-        session = self.db_manager.get_session()
-        
         try:
-            accounts = session.query(Account).filter(
-                Account.user_id == user_id,
-                Account.account_type == 'credit_card'
-            ).order_by(Account.created_at.desc()).all()
-            
-            return [acc.to_dict() for acc in accounts]
-            
+            with self.db_manager.session_scope() as session:
+                accounts = session.execute(
+                    select(Account.__table__).where(
+                        Account.user_id == user_id,
+                        Account.account_type == 'credit_card'
+                    ).order_by(Account.created_at.desc())
+                )
+                
+                return [row_to_dict(acc) for acc in accounts]
+                
         except Exception as e:
             logger.error(f"Error fetching credit card accounts: {e}", exc_info=True)
             return []
-        finally:
-            session.close()
     
     def get_credit_card_payments_summary(
         self,
@@ -272,7 +296,8 @@ class CreditCardService:
         """
         Get summary of credit card payments across all cards
         
-        Aggregates all "Credit Card Payment" category transactions:
+        Aggregates all transactions classified with the "Credit Card Payment"
+        sub-type:
         - By individual card (last 4 digits)
         - By bank
         - By financial year
@@ -284,57 +309,71 @@ class CreditCardService:
         Returns:
             Dictionary with aggregated payment data
         """
-        session = self.db_manager.get_session()
+        # Cache-aside; CreditCardTransactionRepository writes bump the version
+        version = cache.get_version('cc_summary', user_id)
+        cache_key = f"{cache.KEY_PREFIX}:cc_summary:{user_id}:{version}:{financial_year or 'all'}"
+        if version is not None:
+            cached = cache.get_json(cache_key)
+            if cached is not None:
+                return cached
         
         try:
-            # Query all Credit Card Payment transactions
-            query = session.query(Transaction).filter(
-                Transaction.user_id == user_id,
-                Transaction.category == 'Credit Card Payment',
-                Transaction.type == TransactionType.CREDIT  # Only payments (credits)
-            )
-            
-            transactions = query.order_by(Transaction.date.desc()).all()
-            
-            # Group by card, bank, and financial year
-            from collections import defaultdict
-            by_card = defaultdict(float)
-            by_bank = defaultdict(float)
-            by_fy = defaultdict(float)
-            total_payments = 0.0
-            
-            for txn in transactions:
-                # Extract card last 4 from extra_metadata
-                card_last_4 = "Unknown"
-                if txn.extra_metadata:
-                    card_last_4 = txn.extra_metadata.get('card_last_4', 'Unknown')
+            with self.db_manager.session_scope() as session:
+                # Aggregate in SQL: one row per bucket instead of one ORM object per payment
+                txn = CreditCardTransaction
+                card_expr = func.coalesce(txn.extra_metadata['card_last_4'].as_string(), 'Unknown')
+                bank_expr = func.coalesce(txn.bank_name, 'Unknown')
+                fy_expr = _financial_year_expr(txn.date)
                 
-                # Determine financial year (Apr-Mar)
-                txn_date = datetime.strptime(txn.date, '%Y-%m-%d')
-                if txn_date.month >= 4:
-                    fy = f"{txn_date.year}-{txn_date.year + 1}"
-                else:
-                    fy = f"{txn_date.year - 1}-{txn_date.year}"
+                filters = [
+                    txn.user_id == user_id,
+                    # The classifier puts this label in the sub-type, not the category
+                    txn.transaction_sub_type == 'Credit Card Payment',
+                    txn.type == TransactionType.CREDIT  # Only payments (credits)
+                ]
                 
-                # Apply financial year filter if specified
-                if financial_year and fy != financial_year:
-                    continue
+                # Unfiltered by financial year so total_transactions counts every payment
+                fy_rows = session.execute(
+                    select(fy_expr.label('fy'), func.sum(txn.amount), func.count())
+                    .where(*filters)
+                    .group_by(fy_expr)
+                ).all()
+                
+                fy_label = financial_year
+                if financial_year:
+                    # Plain date range on the indexed column instead of the FY expression
+                    fy_range = _financial_year_range(financial_year)
+                    if fy_range:
+                        fy_label = f"{fy_range[0][:4]}-{fy_range[1][:4]}"
+                        filters += [txn.date >= fy_range[0], txn.date < fy_range[1]]
+                    else:
+                        filters.append(fy_expr == financial_year)
+                
+                by_card = dict(session.execute(
+                    select(card_expr, func.sum(txn.amount)).where(*filters).group_by(card_expr)
+                ).all())
+                by_bank = dict(session.execute(
+                    select(bank_expr, func.sum(txn.amount)).where(*filters).group_by(bank_expr)
+                ).all())
+                by_fy = {
+                    fy: amount for fy, amount, _ in fy_rows
+                    if not financial_year or fy == fy_label
+                }
+                
+                summary = {
+                    'total_payments': float(sum(by_fy.values())),
+                    'by_card': by_card,
+                    'by_bank': by_bank,
+                    'by_financial_year': by_fy,
+                    'total_transactions': sum(count for _, _, count in fy_rows),
+                    'financial_year_filter': financial_year
+                }
+                
+                if version is not None:
+                    cache.set_json(cache_key, summary, Config.CC_SUMMARY_CACHE_TTL)
+                
+                return summary
                 
-                # Aggregate
-                by_card[card_last_4] += txn.amount
-                by_bank[txn.bank_name or 'Unknown'] += txn.amount
-                by_fy[fy] += txn.amount
-                total_payments += txn.amount
-            
-            return {
-                'total_payments': total_payments,
-                'by_card': dict(by_card),
-                'by_bank': dict(by_bank),
-                'by_financial_year': dict(by_fy),
-                'total_transactions': len(transactions),
-                'financial_year_filter': financial_year
-            }
-            
         except Exception as e:
             logger.error(f"Error fetching credit card payments summary: {e}", exc_info=True)
             return {
@@ -345,6 +384,4 @@ class CreditCardService:
                 'total_transactions': 0,
                 'financial_year_filter': financial_year
             }
-        finally:
-            session.close()
 
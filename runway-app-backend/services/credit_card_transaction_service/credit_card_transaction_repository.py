@@ -10,8 +10,9 @@ import uuid
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, bindparam
 
+from storage import cache
 from storage.database import DatabaseManager
 from storage.models import (
     CreditCardTransaction, Account, User, Merchant, CreditCardStatement,
@@ -21,6 +22,12 @@ from schema import CanonicalTransaction
 
 logger = logging.getLogger(__name__)
 
+# Built once: the per-insert account type check reuses the statement and its
+# cached compiled form instead of rebuilding a Query each call
+_ACCOUNT_TYPE_STMT = select(Account.account_type).where(
+    Account.account_id == bindparam('account_id')
+)
+
 
 class CreditCardTransactionRepository:
     """
@@ -100,12 +107,12 @@ class CreditCardTransactionRepository:
             
             # Validate account type if account_id provided
             if account_id:
-                account = session.query(Account).filter(
-                    Account.account_id == account_id
-                ).first()
+                account_type = session.execute(
+                    _ACCOUNT_TYPE_STMT, {'account_id': account_id}
+                ).scalar()
                 
-                if account and account.account_type:
-                    account_type = account.account_type.lower()
+                if account_type:
+                    account_type = account_type.lower()
                     if account_type not in ['credit_card', 'credit']:
                         raise ValueError(
                             f"Account {account_id} is not a credit card account. "
@@ -162,6 +169,7 @@ class CreditCardTransactionRepository:
             if close_session:
                 session.commit()
                 session.refresh(txn)
+                cache.bump_version('cc_summary', user_id)
             
             logger.debug(f"Created credit card transaction: {txn.transaction_id[:8]}...")
             return txn
@@ -247,7 +255,9 @@ class CreditCardTransactionRepository:
             if transaction_type:
                 query = query.filter(CreditCardTransaction.type == transaction_type)
             
-            query = query.order_by(CreditCardTransaction.date.desc(), CreditCardTransaction.timestamp.desc())
+            query = query.order_by(
+                CreditCardTransaction.date.desc(), CreditCardTransaction.timestamp.desc().nulls_last()
+            )
             
             if offset:
                 query = query.offset(offset)
@@ -297,6 +307,7 @@ class CreditCardTransactionRepository:
             if close_session:
                 session.commit()
                 session.refresh(txn)
+                cache.bump_version('cc_summary', txn.user_id)
             
             logger.debug(f"Updated credit card transaction: {txn.transaction_id[:8]}...")
             return txn
@@ -339,6 +350,7 @@ class CreditCardTransactionRepository:
             
             if close_session:
                 session.commit()
+                cache.bump_version('cc_summary', txn.user_id)
             
             logger.debug(f"Deleted credit card transaction: {txn.transaction_id[:8]}...")
             return True
@@ -363,6 +375,9 @@ class CreditCardTransactionRepository:
         
         if close_session:
             session = self._get_session()
+            # Inserted values are already on the instances; keep them loaded after
+            # commit so callers can serialize without a per-row reload
+            session.expire_on_commit = False
         
         try:
             created_txns = []
@@ -377,6 +392,7 @@ class CreditCardTransactionRepository:
             
             if close_session:
                 session.commit()
+                cache.bump_version('cc_summary', user_id)
             
             logger.info(f"Bulk inserted {len(created_txns)} credit card transactions")
             return created_txns
@@ -419,7 +435,14 @@ class CreditCardTransactionRepository:
             session = self._get_session()
         
         try:
-            query = session.query(CreditCardTransaction).filter(
+            # Count and sum per type in one pass; overall totals roll up in Python
+            query = session.query(
+                CreditCardTransaction.type,
+                func.count().label('count'),
+                func.coalesce(func.sum(CreditCardTransaction.amount), 0.0).label('total'),
+                func.coalesce(func.sum(CreditCardTransaction.transaction_fee), 0.0).label('fees'),
+                func.coalesce(func.sum(CreditCardTransaction.reward_points), 0.0).label('reward_points')
+            ).filter(
                 CreditCardTransaction.user_id == user_id
             )
             
@@ -432,25 +455,20 @@ class CreditCardTransactionRepository:
             if end_date:
                 query = query.filter(CreditCardTransaction.date <= end_date)
             
-            total_count = query.count()
-            
-            debit_query = query.filter(CreditCardTransaction.type == TransactionType.DEBIT)
-            credit_query = query.filter(CreditCardTransaction.type == TransactionType.CREDIT)
-            
-            total_debit = debit_query.with_entities(func.sum(CreditCardTransaction.amount)).scalar() or 0.0
-            total_credit = credit_query.with_entities(func.sum(CreditCardTransaction.amount)).scalar() or 0.0
-            
-            debit_count = debit_query.count()
-            credit_count = credit_query.count()
-            
-            # Calculate fees
-            total_fees = query.with_entities(
-                func.sum(CreditCardTransaction.transaction_fee)
-            ).scalar() or 0.0
-            
-            total_reward_points = query.with_entities(
-                func.sum(CreditCardTransaction.reward_points)
-            ).scalar() or 0.0
+            by_type = {}
+            total_count = 0
+            total_fees = 0.0
+            total_reward_points = 0.0
+            for txn_type, count, total, fees, reward_points in query.group_by(CreditCardTransaction.type):
+                if isinstance(txn_type, TransactionType):
+                    txn_type = txn_type.value
+                by_type[txn_type] = (count, total)
+                total_count += count
+                total_fees += fees
+                total_reward_points += reward_points
+            
+            debit_count, total_debit = by_type.get(TransactionType.DEBIT.value, (0, 0.0))
+            credit_count, total_credit = by_type.get(TransactionType.CREDIT.value, (0, 0.0))
             
             return {
                 'total_count': total_count,
@@ -45,7 +45,7 @@ class CreditCardTransactionService:
         if account_id:
             session = self.db_manager.get_session()
             try:
-                account = session.query(Account).filter(
+                account = session.query(Account.account_type).filter(
                     Account.account_id == account_id
                 ).first()
                 
@@ -25,6 +25,7 @@ from services.parser_service.transaction_enrichment_service import TransactionEn
 from services.credit_card_service import CreditCardService
 from services.bank_transaction_service.bank_transaction_repository import BankTransactionRepository
 from services.credit_card_transaction_service.credit_card_transaction_repository import CreditCardTransactionRepository
+from storage import cache
 from storage.database import DatabaseManager
 from storage.models import Account
 import uuid
@@ -250,11 +251,11 @@ class ParserService:
             if account_id:
                 session = self.db_manager.get_session()
                 try:
-                    account = session.query(Account).filter(
+                    stored_type = session.query(Account.account_type).filter(
                         Account.account_id == account_id
-                    ).first()
-                    if account and account.account_type:
-                        account_type = account.account_type.lower()
+                    ).scalar()
+                    if stored_type:
+                        account_type = stored_type.lower()
                 finally:
                     session.close()
             
@@ -292,6 +293,7 @@ class ParserService:
                             session.rollback()
                     
                     session.commit()
+                    cache.bump_version('cc_summary', user_id)
                     logger.info(f"✅ Successfully imported {inserted_count}/{len(enriched_transactions)} credit card transactions")
                 except Exception as e:
                     session.rollback()
@@ -477,7 +479,6 @@ class ParserService:
                 
                 session.add(new_account)
                 session.commit()
-                session.refresh(new_account)
                 
                 logger.info(f"✅ Created account: {new_account_id} - {account_name} ({detected_bank_name})")
                 return new_account_id
@@ -520,7 +521,6 @@ class ParserService:
             
             session.add(new_account)
             session.commit()
-            session.refresh(new_account)
             
             logger.info(f"✅ Created default account: {new_account_id} - {account_name}")
             return new_account_id
@@ -5,6 +5,8 @@ Unified interface for accessing both bank and credit card transactions.
 Routes queries to appropriate repositories based on account type or transaction type.
 """
 
+import heapq
+import itertools
 import logging
 from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
@@ -18,6 +20,11 @@ from services.credit_card_transaction_service.credit_card_transaction_repository
 logger = logging.getLogger(__name__)
 
 
+def _recency_key(txn: dict):
+    """Sort key matching both repositories' (date DESC, timestamp DESC NULLS LAST) order"""
+    return (txn.get('date') or '', txn.get('timestamp') or '')
+
+
 class UnifiedTransactionRepository:
     """
     Unified repository for accessing both bank and credit card transactions
@@ -46,12 +53,12 @@ class UnifiedTransactionRepository:
             session = self.db_manager.get_session()
         
         try:
-            account = session.query(Account).filter(
+            account_type = session.query(Account.account_type).filter(
                 Account.account_id == account_id
-            ).first()
+            ).scalar()
             
-            if account and account.account_type:
-                return account.account_type.lower()
+            if account_type:
+                return account_type.lower()
             
             return None
         finally:
@@ -113,38 +120,39 @@ class UnifiedTransactionRepository:
             results.extend([txn.to_dict() for txn in txns])
         
         else:  # 'all'
-            # Get from both repositories
-            bank_txns = self.bank_repo.get_transactions(
+            # Both tables come back newest first; merge the two ordered streams
+            # lazily and stop once the requested page is filled
+            bank_txns = self.bank_repo.iter_transactions(
                 user_id=user_id,
                 account_id=account_id,
                 start_date=start_date,
                 end_date=end_date,
-                category=category,
-                limit=None,  # Get all, will merge and sort
-                offset=None
+                category=category
             )
             
+            # The page can't need more than offset + limit rows from either table
+            stop = (offset or 0) + limit if limit else None
             cc_txns = self.credit_card_repo.get_transactions(
                 user_id=user_id,
                 account_id=account_id,
                 start_date=start_date,
                 end_date=end_date,
                 category=category,
-                limit=None,
+                limit=stop,
                 offset=None
             )
             
-            # Merge and sort by date
-            all_txns = [txn.to_dict() for txn in bank_txns] + [txn.to_dict() for txn in cc_txns]
-            all_txns.sort(key=lambda x: (x.get('date', ''), x.get('timestamp', '')), reverse=True)
-            
-            # Apply pagination after sorting
-            if offset:
-                all_txns = all_txns[offset:]
-            if limit:
-                all_txns = all_txns[:limit]
-            
-            results = all_txns
+            try:
+                merged = heapq.merge(
+                    (txn.to_dict() for txn in bank_txns),
+                    (txn.to_dict() for txn in cc_txns),
+                    key=_recency_key,
+                    reverse=True
+                )
+                results = list(itertools.islice(merged, offset or 0, stop))
+            finally:
+                # Release the streaming session if the page ended early
+                bank_txns.close()
         
         return results
     
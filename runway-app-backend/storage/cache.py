@@ -0,0 +1,103 @@
+"""
+Optional Redis cache for expensive read paths (cache-aside)
+
+Disabled unless REDIS_URL is set and the redis package is installed. Every
+helper then degrades to a no-op, and Redis errors are logged and treated as
+cache misses, so callers never fail because of the cache.
+
+Per-user data is invalidated by bumping a version counter that is part of
+the cached keys (`v1:app:<namespace>:ver:<user_id>`), which avoids scanning
+for keys to delete; stale entries simply expire.
+"""
+
+import json
+import logging
+from typing import Any, Optional
+
+from config import Config
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'v1:app'
+
+_client = None
+
+
+def get_client():
+    """Shared Redis client, or None when caching is disabled"""
+    global _client
+    if _client is None and REDIS_AVAILABLE and Config.REDIS_URL:
+        _client = redis.Redis.from_url(
+            Config.REDIS_URL,
+            socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT
+        )
+    return _client
+
+
+def get_version(namespace: str, user_id: str) -> Optional[int]:
+    """
+    Current cache version of a user's data in a namespace
+
+    Args:
+        namespace: Cache namespace (e.g. 'cc_summary')
+        user_id: User ID
+
+    Returns:
+        Version number, or None when the cache is unavailable
+    """
+    client = get_client()
+    if client is None:
+        return None
+    try:
+        return int(client.get(f"{KEY_PREFIX}:{namespace}:ver:{user_id}") or 0)
+    except redis.RedisError as e:
+        logger.warning(f"Cache version read failed: {e}")
+        return None
+
+
+def bump_version(namespace: str, user_id: str):
+    """
+    Invalidate every cached entry of a user's data in a namespace
+
+    Args:
+        namespace: Cache namespace (e.g. 'cc_summary')
+        user_id: User ID
+    """
+    client = get_client()
+    if client is None:
+        return
+    try:
+        client.incr(f"{KEY_PREFIX}:{namespace}:ver:{user_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Cache invalidation failed: {e}")
+
+
+def get_json(key: str) -> Optional[Any]:
+    """Cached JSON value, or None on miss or when the cache is unavailable"""
+    client = get_client()
+    if client is None:
+        return None
+    try:
+        cached = client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed: {e}")
+        return None
+    return json.loads(cached) if cached is not None else None
+
+
+def set_json(key: str, value: Any, ttl: int):
+    """Cache a JSON-serializable value for ttl seconds"""
+    client = get_client()
+    if client is None:
+        return
+    try:
+        client.set(key, json.dumps(value), ex=ttl)
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed: {e}")
@@ -5,17 +5,26 @@ Handles database connections, sessions, and common operations.
 """
 
 import logging
-from typing import List, Optional, Dict, Any
+import re
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Generator
 from pathlib import Path
 from datetime import datetime
-from sqlalchemy import create_engine, func, text
+from sqlalchemy import Column, create_engine, func, text
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.schema import CreateIndex, DropIndex, Index
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.pool import StaticPool
 
 from .models import (
     Base, Merchant, Account, User,
     TransactionType, TransactionSource, TransactionCategory, RecurringType,
-    BankTransaction, CreditCardTransaction
+    BankTransaction, CreditCardTransaction,
+    idx_bank_transaction_unique, idx_cc_transaction_unique, idx_bank_txn_user_date_id,
+    idx_bank_txn_user_account_date, idx_bank_txn_user_category_date, idx_bank_txn_user_type_date,
+    idx_cc_txn_user_account_date, idx_cc_txn_user_category_date, idx_cc_txn_user_type_date,
+    idx_account_user_type_created
 )
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -23,6 +32,37 @@ from schema import CanonicalTransaction
 
 logger = logging.getLogger(__name__)
 
+# Stored definition of an index, looked up by name
+_INDEX_DEFINITION_SQL = {
+    'sqlite': "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :name",
+    'postgresql': "SELECT indexdef FROM pg_indexes WHERE indexname = :name",
+}
+
+
+def _index_is_outdated(definition: str, index: Index) -> bool:
+    """
+    Whether a stored index definition predates the one declared on the models
+
+    Earlier releases shipped these indexes with fewer columns (no balance)
+    or without the COALESCE normalization, so a definition that does not
+    mention every declared column and function is outdated.
+
+    Args:
+        definition: CREATE INDEX statement as stored by the database
+        index: Index declared on the models
+
+    Returns:
+        True if the index should be dropped and recreated
+    """
+    words = set(re.findall(r'[a-z_][a-z0-9_]*', definition.lower()))
+    if index.unique and 'unique' not in words:
+        return True
+    for expr in index.expressions:
+        for element in visitors.iterate(expr):
+            if isinstance(element, (Column, FunctionElement)) and element.name.lower() not in words:
+                return True
+    return False
+
 
 class DatabaseManager:
     """
@@ -72,6 +112,11 @@ class DatabaseManager:
                 self.database_url,
                 pool_size=10,
                 max_overflow=20,
+                pool_pre_ping=True,  # Verify connections before using
+                pool_recycle=3600,    # Recycle connections after 1 hour
+                # Bulk inserts go out as multi-row INSERT ... VALUES batches;
+                # bigger pages mean fewer round trips per statement import
+                insertmanyvalues_page_size=5000,
                 echo=False
             )
 
@@ -82,72 +127,82 @@ class DatabaseManager:
             bind=self.engine
         )
 
-        # Create all tables
+        self.create_schema()
+
+    def create_schema(self):
+        """Create all tables and indexes (idempotent)"""
         Base.metadata.create_all(bind=self.engine)
         logger.info("Database tables created successfully")
         
-        # Create unique constraints for duplicate prevention
-        # Includes balance to differentiate same transaction at different times in the day
-        # Uses COALESCE to normalize NULL balance to sentinel value (-999999999.99)
-        # SQLite UNIQUE constraint treats NULL as distinct, so we normalize NULLs
-        session = self.get_session()
+        # Indexes declared after the tables first shipped (duplicate prevention,
+        # keyset pagination, filter + date-sort composites) are created with new
+        # tables; add them to tables created before that
+        for index in (idx_bank_transaction_unique, idx_cc_transaction_unique,
+                      idx_bank_txn_user_date_id,
+                      idx_bank_txn_user_account_date, idx_bank_txn_user_category_date,
+                      idx_bank_txn_user_type_date,
+                      idx_cc_txn_user_account_date, idx_cc_txn_user_category_date,
+                      idx_cc_txn_user_type_date,
+                      idx_account_user_type_created):
+            self._upgrade_index(index)
+
+    def _upgrade_index(self, index: Index):
+        """
+        Create a model-declared index on an existing table, rebuilding an outdated one
+
+        An index whose stored definition predates the model (see
+        _index_is_outdated) is dropped and recreated. If the rebuild fails
+        (e.g. existing duplicates block a unique index), the old definition
+        is restored. Up-to-date indexes are left alone instead of being
+        rebuilt on every startup. Failures are logged, not raised.
+
+        Args:
+            index: Index declared on the models
+        """
+        definition_sql = _INDEX_DEFINITION_SQL.get(self.engine.dialect.name)
+        dropped = None
         try:
-            # Drop existing indexes if they exist
-            for idx_name in ['idx_bank_transaction_unique', 'idx_cc_transaction_unique']:
-                try:
-                    session.execute(text(f"DROP INDEX IF EXISTS {idx_name}"))
-                    session.commit()
-                except:
-                    session.rollback()
-                    pass
-
-            # Create unique constraints for bank_transactions table
-            try:
-                session.execute(text("""
-                    CREATE UNIQUE INDEX IF NOT EXISTS idx_bank_transaction_unique 
-                    ON bank_transactions(
-                        user_id, 
-                        account_id, 
-                        date, 
-                        amount, 
-                        description_raw, 
-                        COALESCE(balance, -999999999.99)
-                    )
-                """))
-                logger.info("Unique constraint created for bank_transactions table")
-            except Exception as e:
-                logger.debug(f"Could not create unique constraint for bank_transactions (table may not exist yet): {e}")
-            
-            # Create unique constraints for credit_card_transactions table
-            # Note: Credit card transactions don't have balance, so we use statement_id instead
-            try:
-                session.execute(text("""
-                    CREATE UNIQUE INDEX IF NOT EXISTS idx_cc_transaction_unique 
-                    ON credit_card_transactions(
-                        user_id, 
-                        account_id, 
-                        COALESCE(statement_id, ''),
-                        date, 
-                        amount, 
-                        description_raw
-                    )
-                """))
-                logger.info("Unique constraint created for credit_card_transactions table")
-            except Exception as e:
-                logger.debug(f"Could not create unique constraint for credit_card_transactions (table may not exist yet): {e}")
-            
-            session.commit()
-            logger.info("Unique constraints created successfully")
+            with self.engine.begin() as conn:
+                if definition_sql:
+                    definition = conn.execute(text(definition_sql), {'name': index.name}).scalar()
+                    if definition and _index_is_outdated(definition, index):
+                        logger.info(f"Rebuilding outdated index {index.name}")
+                        conn.execute(DropIndex(index, if_exists=True))
+                        dropped = definition
+                # IF NOT EXISTS: expression indexes can't be reflected for checkfirst
+                conn.execute(CreateIndex(index, if_not_exists=True))
         except Exception as e:
-            session.rollback()
-            logger.warning(f"Could not create unique constraints: {e}")
-        finally:
-            session.close()
+            logger.warning(f"Could not create index {index.name}: {e}")
+            if dropped:
+                self._restore_index(index.name, dropped, definition_sql)
+
+    def _restore_index(self, name: str, definition: str, definition_sql: str):
+        """Recreate a dropped index from its stored definition (pysqlite runs DDL outside the transaction)"""
+        try:
+            with self.engine.begin() as conn:
+                if conn.execute(text(definition_sql), {'name': name}).scalar() is None:
+                    conn.execute(text(definition))
+                    logger.info(f"Restored previous definition of index {name}")
+        except Exception as e:
+            logger.error(f"Could not restore index {name}: {e}")
 
     def get_session(self) -> Session:
         """Get a new database session"""
         return self.SessionLocal()
 
+    @contextmanager
+    def session_scope(self) -> Generator[Session, None, None]:
+        """Session that commits on success, rolls back on error and always closes"""
+        session = self.get_session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
     def insert_transaction(self, canonical_txn: CanonicalTransaction, session: Optional[Session] = None):
         """
         DEPRECATED: Insert a canonical transaction into legacy transactions table
@@ -123,6 +123,20 @@ def _get_enum_column_type(enum_class, enum_name):
         return SQLEnum(enum_class)
 
 
+def row_to_dict(row):
+    """
+    Convert a Core result row into the JSON-ready dict a model's to_dict() returns.
+    Enum members become their values and datetimes ISO strings, so list endpoints
+    can select plain rows instead of hydrating ORM instances.
+    """
+    return {
+        key: value.value if isinstance(value, enum.Enum)
+        else value.isoformat() if isinstance(value, datetime)
+        else value
+        for key, value in row._mapping.items()
+    }
+
+
 class User(Base):
     """User model for multi-user support"""
     __tablename__ = 'users'
@@ -900,7 +914,7 @@ User.credit_card_statements = relationship('CreditCardStatement', back_populates
 User.net_worth_snapshots = relationship('NetWorthSnapshot', back_populates='user', cascade='all, delete-orphan')
 
 # Indexes for performance
-from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint, func
 
 # Composite indexes for common queries
 
@@ -911,6 +925,24 @@ Index('idx_bank_txn_account_date', BankTransaction.account_id, BankTransaction.d
 Index('idx_bank_txn_merchant_date', BankTransaction.merchant_canonical, BankTransaction.date)
 Index('idx_bank_txn_user_month', BankTransaction.user_id, BankTransaction.month)
 Index('idx_bank_txn_type', BankTransaction.type)
+# Keyset pagination: user's rows in (date, transaction_id) order, scanned backwards
+idx_bank_txn_user_date_id = Index(
+    'idx_bank_txn_user_date_id',
+    BankTransaction.user_id, BankTransaction.date, BankTransaction.transaction_id
+)
+# Filter + sort by date: user's rows for one account / category / type, in date order
+idx_bank_txn_user_account_date = Index(
+    'idx_bank_txn_user_account_date',
+    BankTransaction.user_id, BankTransaction.account_id, BankTransaction.date
+)
+idx_bank_txn_user_category_date = Index(
+    'idx_bank_txn_user_category_date',
+    BankTransaction.user_id, BankTransaction.category, BankTransaction.date
+)
+idx_bank_txn_user_type_date = Index(
+    'idx_bank_txn_user_type_date',
+    BankTransaction.user_id, BankTransaction.type, BankTransaction.date
+)
 
 # CreditCardTransaction table indexes
 Index('idx_cc_txn_user_date', CreditCardTransaction.user_id, CreditCardTransaction.date)
@@ -921,6 +953,24 @@ Index('idx_cc_txn_billing_cycle', CreditCardTransaction.account_id, CreditCardTr
 Index('idx_cc_txn_merchant_date', CreditCardTransaction.merchant_canonical, CreditCardTransaction.date)
 Index('idx_cc_txn_user_month', CreditCardTransaction.user_id, CreditCardTransaction.month)
 Index('idx_cc_txn_type', CreditCardTransaction.type)
+idx_cc_txn_user_account_date = Index(
+    'idx_cc_txn_user_account_date',
+    CreditCardTransaction.user_id, CreditCardTransaction.account_id, CreditCardTransaction.date
+)
+idx_cc_txn_user_category_date = Index(
+    'idx_cc_txn_user_category_date',
+    CreditCardTransaction.user_id, CreditCardTransaction.category, CreditCardTransaction.date
+)
+idx_cc_txn_user_type_date = Index(
+    'idx_cc_txn_user_type_date',
+    CreditCardTransaction.user_id, CreditCardTransaction.type, CreditCardTransaction.date
+)
+
+# A user's accounts of one type (credit cards), newest first, without a sort
+idx_account_user_type_created = Index(
+    'idx_account_user_type_created',
+    Account.user_id, Account.account_type, Account.created_at
+)
 
 # Other indexes
 Index('idx_asset_user', Asset.user_id)
@@ -930,11 +980,30 @@ Index('idx_liability_user', Liability.user_id)
 Index('idx_liability_pattern', Liability.recurring_pattern_id)
 Index('idx_net_worth_user_month', NetWorthSnapshot.user_id, NetWorthSnapshot.month)
 
-# Unique constraint to prevent exact duplicate transactions
-# NOTE: SQLite UNIQUE constraint treats NULL as distinct, so we can't use balance directly
-# We need to use COALESCE in raw SQL to normalize NULL values
-# This unique index is created via raw SQL in database.py and reset_and_setup.py
+# Unique indexes to prevent exact duplicate transactions
+# NOTE: SQLite UNIQUE constraint treats NULL as distinct, so nullable columns are
+# normalized with COALESCE expressions (created by create_all like any other index)
 # INCLUDES BALANCE: Two transactions with same date/amount/description but different balances 
 # are considered different (e.g., same transaction at different times in the day)
 # NULL balance is normalized to -999999999.99 to handle NULL comparison correctly
-# Index('idx_transaction_unique', ...) - Created via raw SQL instead (see database.py)
+idx_bank_transaction_unique = Index(
+    'idx_bank_transaction_unique',
+    BankTransaction.user_id,
+    BankTransaction.account_id,
+    BankTransaction.date,
+    BankTransaction.amount,
+    BankTransaction.description_raw,
+    func.coalesce(BankTransaction.balance, -999999999.99),
+    unique=True
+)
+# Credit card transactions don't have balance, so statement_id is used instead
+idx_cc_transaction_unique = Index(
+    'idx_cc_transaction_unique',
+    CreditCardTransaction.user_id,
+    CreditCardTransaction.account_id,
+    func.coalesce(CreditCardTransaction.statement_id, ''),
+    CreditCardTransaction.date,
+    CreditCardTransaction.amount,
+    CreditCardTransaction.description_raw,
+    unique=True
+)
@@ -196,6 +196,19 @@ def sample_emi_transactions_list(sample_emi_transaction_data):
     return transactions
 
 
+# ============================================================================
+# SQLite Database Fixtures
+# ============================================================================
+
+@pytest.fixture
+def sqlite_db_manager(tmp_path):
+    """DatabaseManager over a fresh SQLite database file with the full schema"""
+    from storage.database import DatabaseManager
+    db_manager = DatabaseManager(f"sqlite:///{tmp_path / 'finance.db'}")
+    yield db_manager
+    db_manager.close()
+
+
 # ============================================================================
 # Mock Database Fixtures
 # ============================================================================
@@ -0,0 +1,93 @@
+"""
+Unit tests for BankTransactionRepository
+
+Run with: pytest tests/test_bank_transaction_repository.py -v
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from services.bank_transaction_service.bank_transaction_repository import BankTransactionRepository
+from storage.models import BankTransaction
+
+
+class TestBankTransactionRepository:
+    """Test suite for BankTransactionRepository"""
+
+    @pytest.fixture
+    def repository(self, sqlite_db_manager):
+        """Repository over the test database"""
+        return BankTransactionRepository(sqlite_db_manager)
+
+    def _stored(self, sqlite_db_manager, *columns):
+        """Stored rows as {transaction_id: (columns...)}"""
+        session = sqlite_db_manager.get_session()
+        try:
+            rows = session.execute(select(BankTransaction.transaction_id, *columns)).all()
+        finally:
+            session.close()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def test_bulk_insert_does_not_modify_input(self, repository, sqlite_db_manager):
+        """Test bulk insert fills ids and timestamps without touching the caller's dicts"""
+        transactions = [
+            {'date': '2024-03-01', 'amount': 100.0, 'description_raw': 'A'},
+            {'transaction_id': 'kept-id', 'date': '2024-03-02', 'amount': 200.0, 'description_raw': 'B'},
+        ]
+        originals = [dict(txn) for txn in transactions]
+
+        created = repository.bulk_insert_transactions(transactions, 'user-1')
+
+        assert transactions == originals
+        assert created[1].transaction_id == 'kept-id'
+        assert created[0].transaction_id and created[0].transaction_id != 'kept-id'
+
+        stored = self._stored(sqlite_db_manager, BankTransaction.ingestion_timestamp, BankTransaction.amount)
+        assert set(stored) == {created[0].transaction_id, 'kept-id'}
+        # One ingestion timestamp for the whole batch
+        assert stored[created[0].transaction_id][0] == stored['kept-id'][0]
+
+    def test_bulk_update_updates_owned_rows_and_skips_unknown_ids(self, repository, sqlite_db_manager):
+        """Test bulk update changes the user's rows and ignores unknown or foreign ids"""
+        repository.bulk_insert_transactions([
+            {'transaction_id': 'txn-1', 'date': '2024-03-01', 'amount': 100.0},
+            {'transaction_id': 'txn-2', 'date': '2024-03-02', 'amount': 200.0},
+        ], 'user-1')
+        repository.bulk_insert_transactions([
+            {'transaction_id': 'txn-3', 'date': '2024-03-03', 'amount': 300.0},
+        ], 'user-2')
+
+        updated = repository.bulk_update_transactions([
+            {'transaction_id': 'txn-1', 'amount': 150.0, 'merchant_canonical': 'Swiggy'},
+            {'transaction_id': 'txn-2', 'amount': 250.0, 'not_a_column': 'ignored'},
+            {'transaction_id': 'missing', 'amount': 999.0},
+            {'transaction_id': 'txn-3', 'amount': 999.0},
+        ], 'user-1')
+
+        assert updated == 2
+        stored = self._stored(sqlite_db_manager, BankTransaction.amount, BankTransaction.merchant_canonical)
+        assert stored == {
+            'txn-1': (150.0, 'Swiggy'),
+            'txn-2': (250.0, None),
+            'txn-3': (300.0, None),
+        }
+
+    def test_iter_transactions_streams_in_listing_order(self, repository):
+        """Test iter_transactions yields the same rows and order as get_transactions"""
+        repository.bulk_insert_transactions([
+            {'transaction_id': f'txn-{i}', 'date': f'2024-03-{i % 5 + 1:02d}', 'amount': float(i)}
+            for i in range(12)
+        ], 'user-1')
+
+        streamed = list(repository.iter_transactions(
+            'user-1', columns=('transaction_id', 'date'), batch_size=5
+        ))
+        listed = repository.get_transactions('user-1', columns=('transaction_id', 'date'))
+
+        assert len(streamed) == 12
+        assert streamed == listed
@@ -0,0 +1,122 @@
+"""
+Unit tests for BankTransactionService keyset pagination
+
+Run with: pytest tests/test_bank_transaction_service.py -v
+"""
+
+import importlib.util
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from auth.dependencies import get_current_user
+from services.bank_transaction_service.bank_transaction_service import BankTransactionService
+from storage.models import BankTransaction, TransactionType, User
+
+
+def _load_routes():
+    """Load the bank transaction routes module on its own (without api.routes' other routers)"""
+    path = Path(__file__).parent.parent / 'api' / 'routes' / 'bank_transactions.py'
+    spec = importlib.util.spec_from_file_location('bank_transaction_routes', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestBankTransactionServiceKeyset:
+    """Test suite for cursor pagination of the bank transactions list"""
+
+    @pytest.fixture
+    def db_manager(self, sqlite_db_manager):
+        """SQLite database with 7 transactions, several sharing a date"""
+        session = sqlite_db_manager.get_session()
+        session.add_all([
+            BankTransaction(transaction_id=f'txn-{i}', user_id='user-1', account_id='acc-1',
+                            date=f'2024-03-0{1 + i // 3}', amount=float(i), type=TransactionType.DEBIT)
+            for i in range(7)
+        ])
+        session.commit()
+        session.close()
+        return sqlite_db_manager
+
+    @pytest.fixture
+    def service(self, db_manager):
+        """Service over the test database"""
+        return BankTransactionService(db_manager)
+
+    @pytest.fixture
+    def client(self, service):
+        """API client for the bank transaction routes, logged in as user-1"""
+        routes = _load_routes()
+        app = FastAPI()
+        app.include_router(routes.router, prefix='/bank-transactions')
+        app.dependency_overrides[get_current_user] = lambda: User(user_id='user-1', username='user-1')
+        app.dependency_overrides[routes.get_bank_transaction_service] = lambda: service
+        return TestClient(app)
+
+    def test_cursor_round_trip(self):
+        """Test next_cursor encodes the last row's date and id for _decode_cursor"""
+        page = [
+            {'date': '2024-03-02', 'transaction_id': 'txn-5'},
+            {'date': '2024-03-01', 'transaction_id': 'txn|2'},
+        ]
+
+        cursor = BankTransactionService.next_cursor(page, limit=2)
+
+        assert BankTransactionService._decode_cursor(cursor) == ('2024-03-01', 'txn|2')
+
+    def test_no_cursor_after_last_page(self):
+        """Test a short or empty page has no next cursor"""
+        page = [{'date': '2024-03-01', 'transaction_id': 'txn-1'}]
+
+        assert BankTransactionService.next_cursor(page, limit=2) is None
+        assert BankTransactionService.next_cursor([], limit=2) is None
+
+    @pytest.mark.parametrize('cursor', ['!!not-base64', 'bm8tc2VwYXJhdG9y'])
+    def test_invalid_cursor_raises(self, service, cursor):
+        """Test malformed cursors (bad base64, no separator) raise ValueError"""
+        with pytest.raises(ValueError, match='Invalid pagination cursor'):
+            service.get_transactions('user-1', limit=3, cursor=cursor)
+
+    def test_pages_continue_across_equal_dates(self, service):
+        """Test keyset pages cover every row once, in order, when dates repeat"""
+        seen = []
+        page = service.get_transactions('user-1', limit=2, keyset=True)
+        while page:
+            seen.extend(txn['transaction_id'] for txn in page)
+            cursor = service.next_cursor(page, 2)
+            if cursor is None:
+                break
+            page = service.get_transactions('user-1', limit=2, cursor=cursor)
+
+        expected = sorted(
+            (f'2024-03-0{1 + i // 3}', f'txn-{i}') for i in range(7)
+        )[::-1]
+        assert seen == [txn_id for _, txn_id in expected]
+
+    def test_route_follows_next_cursor_header(self, client):
+        """Test the X-Next-Cursor header walks all pages and is absent on the last"""
+        seen = []
+        response = client.get('/bank-transactions/', params={'keyset': True, 'page_size': 3})
+        while True:
+            assert response.status_code == 200
+            seen.extend(txn['transaction_id'] for txn in response.json())
+            cursor = response.headers.get('X-Next-Cursor')
+            if cursor is None:
+                break
+            response = client.get('/bank-transactions/', params={'cursor': cursor, 'page_size': 3})
+
+        assert len(seen) == 7
+        assert len(set(seen)) == 7
+
+    def test_route_rejects_invalid_cursor(self, client):
+        """Test a malformed cursor is a 400, not a 500"""
+        response = client.get('/bank-transactions/', params={'cursor': '!!not-base64'})
+
+        assert response.status_code == 400
+        assert 'Invalid pagination cursor' in response.json()['detail']
@@ -0,0 +1,169 @@
+"""
+Unit tests for CreditCardService
+
+Run with: pytest tests/test_credit_card_service.py -v
+"""
+
+import pytest
+import uuid
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.credit_card_service.credit_card_service import CreditCardService
+from services.credit_card_transaction_service.credit_card_transaction_repository import CreditCardTransactionRepository
+from storage import cache
+from storage.models import CreditCardTransaction, TransactionType
+
+
+class TestCreditCardPaymentsSummary:
+    """Test suite for CreditCardService.get_credit_card_payments_summary"""
+
+    @pytest.fixture
+    def service(self, sqlite_db_manager):
+        """Service with a few card payments and purchases stored"""
+        def txn(date, amount, txn_type, sub_type, card, bank, user_id='user-1'):
+            return CreditCardTransaction(
+                transaction_id=str(uuid.uuid4()),
+                user_id=user_id,
+                date=date,
+                amount=amount,
+                type=txn_type,
+                transaction_sub_type=sub_type,
+                bank_name=bank,
+                extra_metadata={'card_last_4': card} if card else None
+            )
+
+        session = sqlite_db_manager.get_session()
+        session.add_all([
+            txn('2024-05-10', 10000.0, TransactionType.CREDIT, 'Credit Card Payment', '1234', 'HDFC Bank'),
+            txn('2025-02-10', 5000.0, TransactionType.CREDIT, 'Credit Card Payment', '5678', 'ICICI Bank'),
+            txn('2025-04-10', 2000.0, TransactionType.CREDIT, 'Credit Card Payment', None, None),
+            # Not payments: a purchase, an unclassified refund, another user's payment
+            txn('2024-06-01', 700.0, TransactionType.DEBIT, 'Credit Card Payment', '1234', 'HDFC Bank'),
+            txn('2024-06-02', 300.0, TransactionType.CREDIT, None, '1234', 'HDFC Bank'),
+            txn('2024-06-03', 900.0, TransactionType.CREDIT, 'Credit Card Payment', '9999', 'HDFC Bank',
+                user_id='user-2'),
+        ])
+        session.commit()
+        session.close()
+        return CreditCardService(sqlite_db_manager)
+
+    def test_totals_include_only_payments(self, service):
+        """Test payments are summed by card, bank and financial year"""
+        summary = service.get_credit_card_payments_summary('user-1')
+
+        assert summary['total_payments'] == 17000.0
+        assert summary['total_transactions'] == 3
+        assert summary['by_card'] == {'1234': 10000.0, '5678': 5000.0, 'Unknown': 2000.0}
+        assert summary['by_bank'] == {'HDFC Bank': 10000.0, 'ICICI Bank': 5000.0, 'Unknown': 2000.0}
+        assert summary['by_financial_year'] == {'2024-2025': 15000.0, '2025-2026': 2000.0}
+
+    def test_financial_year_filter(self, service):
+        """Test a short financial year label limits the totals to its date range"""
+        summary = service.get_credit_card_payments_summary('user-1', financial_year='2024-25')
+
+        assert summary['total_payments'] == 15000.0
+        assert summary['by_card'] == {'1234': 10000.0, '5678': 5000.0}
+        assert summary['by_financial_year'] == {'2024-2025': 15000.0}
+        assert summary['financial_year_filter'] == '2024-25'
+
+
+class FakeRedisError(Exception):
+    """Stands in for redis.RedisError"""
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis client calls storage.cache makes"""
+
+    def __init__(self):
+        self.store = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise FakeRedisError('connection refused')
+
+    def get(self, key):
+        self._check()
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.store[key] = value.encode()
+
+    def incr(self, key):
+        self._check()
+        self.store[key] = str(int(self.store.get(key, 0)) + 1).encode()
+
+
+class TestCreditCardPaymentsSummaryCache(TestCreditCardPaymentsSummary):
+    """Re-runs the summary tests with the Redis cache enabled, plus cache-aside behaviour"""
+
+    @pytest.fixture(autouse=True)
+    def redis_client(self, monkeypatch):
+        """Fake Redis client installed as the shared cache client"""
+        client = FakeRedis()
+        monkeypatch.setattr(cache, '_client', client)
+        monkeypatch.setattr(cache, 'redis', SimpleNamespace(RedisError=FakeRedisError), raising=False)
+        return client
+
+    def test_summary_is_served_from_cache(self, service, redis_client, monkeypatch):
+        """Test a second call returns the cached summary, without querying the database"""
+        first = service.get_credit_card_payments_summary('user-1')
+        assert redis_client.store
+
+        db_calls = []
+
+        def no_database():
+            db_calls.append(True)
+            raise RuntimeError('database queried on a cache hit')
+
+        monkeypatch.setattr(service.db_manager, 'session_scope', no_database)
+        assert service.get_credit_card_payments_summary('user-1') == first
+        assert db_calls == []
+
+    def test_version_bump_invalidates_summary(self, service, sqlite_db_manager):
+        """Test bumping the user's cache version (as repository writes do) recomputes the summary"""
+        assert service.get_credit_card_payments_summary('user-1')['total_payments'] == 17000.0
+
+        session = sqlite_db_manager.get_session()
+        session.add(CreditCardTransaction(
+            transaction_id=str(uuid.uuid4()), user_id='user-1', date='2025-05-01', amount=1000.0,
+            type=TransactionType.CREDIT, transaction_sub_type='Credit Card Payment'
+        ))
+        session.commit()
+        session.close()
+        assert service.get_credit_card_payments_summary('user-1')['total_payments'] == 17000.0
+
+        cache.bump_version('cc_summary', 'user-1')
+        assert service.get_credit_card_payments_summary('user-1')['total_payments'] == 18000.0
+
+    def test_bulk_insert_bumps_version_only_after_own_commit(self, sqlite_db_manager, redis_client):
+        """Test a caller-owned session leaves the cache version for the caller to bump after commit"""
+        repository = CreditCardTransactionRepository(sqlite_db_manager)
+        version_key = f"{cache.KEY_PREFIX}:cc_summary:ver:user-1"
+        payment = {
+            'date': '2025-05-01', 'amount': 1000.0, 'type': TransactionType.CREDIT,
+            'transaction_sub_type': 'Credit Card Payment',
+        }
+
+        session = sqlite_db_manager.get_session()
+        repository.bulk_insert_transactions([payment], 'user-1', session=session)
+        assert version_key not in redis_client.store
+        session.rollback()
+        session.close()
+
+        repository.bulk_insert_transactions([payment], 'user-1')
+        assert redis_client.store[version_key] == b'1'
+
+    def test_redis_errors_fall_back_to_database(self, service, redis_client):
+        """Test an unreachable Redis is treated as a cache miss"""
+        redis_client.down = True
+
+        summary = service.get_credit_card_payments_summary('user-1')
+
+        assert summary['total_payments'] == 17000.0
+        assert redis_client.store == {}
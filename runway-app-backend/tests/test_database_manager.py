@@ -0,0 +1,79 @@
+"""
+Unit tests for DatabaseManager schema setup
+
+Run with: pytest tests/test_database_manager.py -v
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from storage.database import DatabaseManager, _index_is_outdated
+from storage.models import idx_bank_transaction_unique, idx_cc_transaction_unique, idx_bank_txn_user_date_id
+
+
+INDEX_SQL = "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = :name"
+
+
+class TestCreateSchemaIndexes:
+    """Test suite for the index upgrade in DatabaseManager.create_schema"""
+
+    @pytest.fixture
+    def database_url(self, tmp_path):
+        """URL of a fresh SQLite database file"""
+        return f"sqlite:///{tmp_path / 'finance.db'}"
+
+    def _index_sql(self, db_manager, name):
+        with db_manager.engine.connect() as conn:
+            return conn.execute(text(INDEX_SQL), {'name': name}).scalar()
+
+    def _replace_index(self, db_manager, sql):
+        with db_manager.engine.begin() as conn:
+            conn.execute(text("DROP INDEX idx_bank_transaction_unique"))
+            conn.execute(text(sql))
+
+    def test_fresh_indexes_are_up_to_date(self, database_url):
+        """Test indexes created from the models are not treated as outdated"""
+        db_manager = DatabaseManager(database_url)
+        for index in (idx_bank_transaction_unique, idx_cc_transaction_unique, idx_bank_txn_user_date_id):
+            assert not _index_is_outdated(self._index_sql(db_manager, index.name), index)
+        db_manager.close()
+
+    def test_outdated_index_is_rebuilt(self, database_url):
+        """Test an index from an older release is dropped and recreated"""
+        db_manager = DatabaseManager(database_url)
+        self._replace_index(db_manager, (
+            "CREATE UNIQUE INDEX idx_bank_transaction_unique "
+            "ON bank_transactions(user_id, account_id, date, amount, description_raw)"
+        ))
+        db_manager.close()
+
+        db_manager = DatabaseManager(database_url)
+        sql = self._index_sql(db_manager, 'idx_bank_transaction_unique').lower()
+        db_manager.close()
+
+        assert 'coalesce(balance' in sql
+        assert not _index_is_outdated(sql, idx_bank_transaction_unique)
+
+    def test_failed_rebuild_keeps_old_index(self, database_url):
+        """Test duplicates blocking the new unique index leave the old one in place"""
+        db_manager = DatabaseManager(database_url)
+        old_sql = "CREATE INDEX idx_bank_transaction_unique ON bank_transactions(user_id, date)"
+        self._replace_index(db_manager, old_sql)
+        with db_manager.engine.begin() as conn:
+            for txn_id in ('txn-1', 'txn-2'):
+                conn.execute(text(
+                    "INSERT INTO bank_transactions "
+                    "(transaction_id, user_id, account_id, date, amount, type, description_raw) "
+                    "VALUES (:id, 'user-1', 'acc-1', '2024-03-01', 100.0, 'DEBIT', 'SAME ROW')"
+                ), {'id': txn_id})
+        db_manager.close()
+
+        # Logged, not raised
+        db_manager = DatabaseManager(database_url)
+        assert self._index_sql(db_manager, 'idx_bank_transaction_unique') == old_sql
+        db_manager.close()
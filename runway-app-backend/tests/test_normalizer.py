@@ -267,6 +267,20 @@ class TestNormalizer:
         except Exception as e:
             pytest.skip(f"Schema import issue: {e}")
 
+    def test_normalizer_normalize_shares_batch_ingestion_timestamp(self):
+        """Test all transactions of one normalize call share an ingestion timestamp"""
+        normalizer = Normalizer(source="csv")
+
+        raw_txns = [
+            {'date': '2024-10-26', 'description': 'Test A', 'amount': 100.0, 'type': 'debit'},
+            {'date': '2024-10-27', 'description': 'Test B', 'amount': 200.0, 'type': 'credit'},
+        ]
+
+        result = normalizer.normalize(raw_txns)
+        assert len(result) == 2
+        assert result[0].ingestion_timestamp
+        assert result[0].ingestion_timestamp == result[1].ingestion_timestamp
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
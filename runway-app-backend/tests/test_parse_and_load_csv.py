@@ -0,0 +1,126 @@
+"""
+Unit tests for the CSV loader in parse_and_load_csv
+
+Run with: pytest tests/test_parse_and_load_csv.py -v
+"""
+
+import pytest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from parse_and_load_csv import (
+    load_csv_to_db, format_months,
+    categorize_transaction_smart, categorize_transactions_vectorized
+)
+from storage.models import (
+    BankTransaction, TransactionType, TransactionSource, TransactionCategory
+)
+
+
+class TestFormatMonths:
+    """Test suite for format_months"""
+
+    def test_year_first_and_day_first_layouts(self):
+        """Test ISO and Y/m/d dates are year-first, slash and dash dates day-first"""
+        dates = [
+            '2024-03-05', '2024-03-05 10:11:12', '2024/03/05',
+            '05/03/2024', '05/03/24', '5/3/2024', '05-03-2024',
+        ]
+        assert format_months(dates).tolist() == ['2024-03'] * len(dates)
+
+    def test_unparseable_dates_fall_back_to_scalar_formatter(self):
+        """Test dates in no known layout go through format_month"""
+        assert format_months(['', 'garbage']).tolist() == ['', 'garbage']
+
+
+class TestCategorization:
+    """Test suite for the scalar and vectorized categorizers"""
+
+    @pytest.mark.parametrize('description', [
+        'EMIHDFC',
+        'NACH/BAJAJFIN/EMI',
+        'ACH D- HDFCLTD LOAN',
+        'ICICIBANK EMI',
+        'KOTAKMAHINDRA LOAN',
+        'IDFCFIRSTBANK LOAN',
+        'SBIN LOAN REPAYMENT',
+    ])
+    def test_bank_names_glued_to_other_text_are_loan_emis(self, description):
+        """Test bank/NBFC names inside longer words still mark EMIs"""
+        assert categorize_transaction_smart(description, 5000) == ('emi', 'Loan EMI')
+
+    def test_vectorized_matches_scalar(self):
+        """Test both categorizers agree row by row"""
+        descriptions = [
+            'EMIHDFC', 'NACH/BAJAJFIN/EMI', 'ACH D- HDFCLTD LOAN', 'ICICIBANK EMI',
+            'KOTAKMAHINDRA LOAN', 'IDFCFIRSTBANK LOAN', 'SBIN LOAN REPAYMENT',
+            'CANFIN HOMES EMI', 'BAJAJ PERSONAL LOAN', 'UPI/SBI/123 TRANSFER',
+            'BUSINESS LUNCH', 'SALARY CREDITED', 'SWIGGY ORDER', 'AMAZON PAY',
+            'ATM CASH WDL', 'LIC PREMIUM', 'RANDOM MERCHANT', 'CREDIT REVERSAL',
+        ]
+        amounts = [500.0, 5000.0, 15000.0, 45000.0]
+        rows = [(d, a) for d in descriptions for a in amounts]
+
+        types, names = categorize_transactions_vectorized(
+            pd.Series([d for d, _ in rows]), np.array([a for _, a in rows])
+        )
+
+        assert list(zip(types.tolist(), names.tolist())) == [
+            categorize_transaction_smart(d, a) for d, a in rows
+        ]
+
+
+class TestLoadCsvToDb:
+    """Test suite for load_csv_to_db"""
+
+    @pytest.fixture
+    def csv_path(self, tmp_path):
+        """Small bank statement export"""
+        path = tmp_path / 'statement.csv'
+        path.write_text(
+            "Date,Narration,Withdrawal Amount,Deposit Amount\n"
+            "2024-03-05,SWIGGY ORDER 1234,450.00,\n"
+            "2024-03-07,SALARY CREDITED ACME,,85000.00\n"
+            "2024-03-10,NACH/BAJAJFIN/EMI,12500.00,\n"
+            "2024-03-11,OPENING BALANCE,,\n"
+        )
+        return path
+
+    def test_load_inserts_bank_transactions(self, sqlite_db_manager, csv_path):
+        """Test rows are stored as bank transactions with enum columns set"""
+        session = sqlite_db_manager.get_session()
+        try:
+            load_csv_to_db(csv_path, 'user-1', session)
+        finally:
+            session.close()
+
+        session = sqlite_db_manager.get_session()
+        try:
+            txns = {
+                txn.description_raw: txn
+                for txn in session.query(BankTransaction).filter(BankTransaction.user_id == 'user-1')
+            }
+        finally:
+            session.close()
+
+        # The row without an amount is skipped
+        assert set(txns) == {'SWIGGY ORDER 1234', 'SALARY CREDITED ACME', 'NACH/BAJAJFIN/EMI'}
+
+        food = txns['SWIGGY ORDER 1234']
+        assert food.type == TransactionType.DEBIT
+        assert food.amount == 450.0
+        assert food.category == TransactionCategory.FOOD_DINING
+        assert food.source == TransactionSource.CSV
+        assert food.month == '2024-03'
+        assert food.ingestion_timestamp is not None
+
+        assert txns['SALARY CREDITED ACME'].type == TransactionType.CREDIT
+
+        emi = txns['NACH/BAJAJFIN/EMI']
+        assert emi.category == TransactionCategory.OTHER
+        assert emi.transaction_sub_type == 'Loan EMI'
@@ -0,0 +1,141 @@
+"""
+Unit tests for PrivacyVault
+
+Run with: pytest tests/test_privacy_vault.py -v
+"""
+
+import base64
+import gc
+import json
+import os
+import pytest
+import sys
+import time
+import weakref
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from privacy.vault import PrivacyVault, VaultWriteError
+
+
+class TestPrivacyVault:
+    """Test suite for PrivacyVault persistence"""
+
+    @pytest.fixture(autouse=True)
+    def workdir(self, tmp_path, monkeypatch):
+        """Run in a temporary directory so .vault_key is written there"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.delenv('VAULT_KEY', raising=False)
+        return tmp_path
+
+    @pytest.fixture
+    def key(self):
+        """Fresh base64 vault key"""
+        return PrivacyVault._generate_key()
+
+    def test_store_and_reload(self, workdir, key):
+        """Test entries written by one vault are read back by the next"""
+        with PrivacyVault(str(workdir / 'vault'), key=key) as vault:
+            ref_id = vault.store_pii('1234567890', entity_type='account_number')
+
+        with PrivacyVault(str(workdir / 'vault'), key=key) as vault:
+            assert vault.retrieve_pii(ref_id) == '1234567890'
+
+    def test_flush_raises_and_keeps_failed_changes_queued(self, workdir, key):
+        """Test a failed entry write is reported and retried by the next flush"""
+        vault = PrivacyVault(str(workdir / 'vault'), key=key)
+        vault.store_pii('ok-entry')
+        failing_ref = vault.store_pii('failing-entry')
+
+        write_entry = vault._write_entry
+
+        def flaky_write(ref_id, entry):
+            if ref_id == failing_ref:
+                raise OSError('disk full')
+            write_entry(ref_id, entry)
+
+        with patch.object(vault, '_write_entry', side_effect=flaky_write):
+            with pytest.raises(VaultWriteError) as excinfo:
+                vault.flush()
+
+        assert set(excinfo.value.failures) == {failing_ref}
+        assert not vault._entry_path(failing_ref).exists()
+
+        vault.flush()
+        assert vault._entry_path(failing_ref).exists()
+        vault.close()
+
+    def test_rotate_key_failure_keeps_old_key_and_data(self, workdir, key):
+        """Test a failed rotation restores the key in memory and in .vault_key"""
+        (workdir / '.vault_key').write_text(key)
+        vault = PrivacyVault(str(workdir / 'vault'))
+        ref_id = vault.store_pii('1234567890')
+        vault.flush()
+
+        with patch.object(vault, '_write_entry', side_effect=OSError('disk full')):
+            assert vault.rotate_key() is False
+
+        assert vault.key == key
+        assert (workdir / '.vault_key').read_text() == key
+        vault.close()
+
+        with PrivacyVault(str(workdir / 'vault'), key=key) as reopened:
+            assert reopened.retrieve_pii(ref_id) == '1234567890'
+
+    def test_rotate_key_saves_new_key(self, workdir, key):
+        """Test a successful rotation re-encrypts entries and saves the new key"""
+        vault = PrivacyVault(str(workdir / 'vault'), key=key)
+        ref_id = vault.store_pii('1234567890')
+
+        assert vault.rotate_key() is True
+        new_key = (workdir / '.vault_key').read_text()
+        assert new_key == vault.key != key
+        vault.close()
+
+        with PrivacyVault(str(workdir / 'vault'), key=new_key) as reopened:
+            assert reopened.retrieve_pii(ref_id) == '1234567890'
+
+    def test_legacy_file_path_is_migrated(self, workdir, key):
+        """Test passing a legacy single-file vault path migrates it into a directory"""
+        legacy_path = workdir / 'privacy_vault.enc'
+        ref_id = PrivacyVault._generate_ref_id('1234567890')
+        legacy_data = {ref_id: {
+            'data': '1234567890', 'entity_type': 'account_number',
+            'created_at': '2024-03-01T10:00:00', 'accessed_count': 0, 'last_accessed': None,
+        }}
+        nonce = os.urandom(12)
+        cipher = AESGCM(base64.b64decode(key))
+        legacy_path.write_bytes(nonce + cipher.encrypt(nonce, json.dumps(legacy_data).encode(), None))
+
+        with PrivacyVault(str(legacy_path), key=key) as vault:
+            assert vault.vault_path == workdir / 'privacy_vault'
+            assert vault.retrieve_pii(ref_id) == '1234567890'
+
+        assert (workdir / 'privacy_vault').is_dir()
+        assert (workdir / 'privacy_vault.enc.migrated').is_file()
+        assert not legacy_path.exists()
+
+    def test_unused_vault_is_garbage_collected(self, workdir, key):
+        """Test neither the exit hook nor the writer thread keep a vault alive"""
+        vault = PrivacyVault(str(workdir / 'vault'), key=key)
+        ref_id = vault.store_pii('1234567890')
+        writer = vault._writer
+        vault_ref = weakref.ref(vault)
+
+        # The writer only holds the vault while it is writing a batch
+        del vault
+        for _ in range(100):
+            gc.collect()
+            if vault_ref() is None:
+                break
+            time.sleep(0.05)
+
+        assert vault_ref() is None
+        writer.join(timeout=5)
+        assert not writer.is_alive()
+        # Pending changes were written when the vault was collected
+        assert (workdir / 'vault' / f'{ref_id}.enc').exists()
@@ -0,0 +1,65 @@
+"""
+Unit tests for UnifiedTransactionRepository
+
+Run with: pytest tests/test_unified_transaction_repository.py -v
+"""
+
+import pytest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.transaction_service.unified_transaction_repository import UnifiedTransactionRepository
+from storage.models import BankTransaction, CreditCardTransaction, TransactionType
+
+
+class TestUnifiedTransactionRepository:
+    """Test suite for UnifiedTransactionRepository.get_transactions"""
+
+    @pytest.fixture
+    def db_manager(self, sqlite_db_manager):
+        """SQLite database with bank and credit card rows on interleaved dates"""
+        session = sqlite_db_manager.get_session()
+        rows = [
+            (BankTransaction, 'bank-1', '2024-03-01', datetime(2024, 3, 1, 9)),
+            (BankTransaction, 'bank-2', '2024-03-03', None),
+            (BankTransaction, 'bank-3', '2024-03-05', datetime(2024, 3, 5, 18)),
+            (BankTransaction, 'bank-4', '2024-03-05', datetime(2024, 3, 5, 8)),
+            (CreditCardTransaction, 'cc-1', '2024-03-02', None),
+            (CreditCardTransaction, 'cc-2', '2024-03-05', datetime(2024, 3, 5, 12)),
+            (CreditCardTransaction, 'cc-3', '2024-03-03', datetime(2024, 3, 3, 10)),
+        ]
+        session.add_all([
+            model(transaction_id=txn_id, user_id='user-1', date=date, timestamp=timestamp,
+                  amount=100.0, type=TransactionType.DEBIT)
+            for model, txn_id, date, timestamp in rows
+        ])
+        session.commit()
+        session.close()
+        return sqlite_db_manager
+
+    @pytest.fixture
+    def repository(self, db_manager):
+        """Repository over the test database"""
+        return UnifiedTransactionRepository(db_manager)
+
+    def test_all_merges_both_tables_newest_first(self, repository):
+        """Test the 'all' listing interleaves both tables by date, then timestamp"""
+        txns = repository.get_transactions('user-1', transaction_type='all')
+
+        assert [t['transaction_id'] for t in txns] == [
+            'bank-3', 'cc-2', 'bank-4', 'cc-3', 'bank-2', 'cc-1', 'bank-1'
+        ]
+
+    def test_all_pages_slice_the_merged_order(self, repository):
+        """Test offset/limit pages are consecutive slices of the merged listing"""
+        full = [t['transaction_id'] for t in repository.get_transactions('user-1')]
+
+        pages = [
+            [t['transaction_id'] for t in repository.get_transactions('user-1', limit=3, offset=offset)]
+            for offset in (0, 3, 6)
+        ]
+
+        assert pages == [full[0:3], full[3:6], full[6:9]]
@@ -99,7 +99,24 @@ class TestMLCategorizer:
         assert len(results) == len(test_txns)
         assert all(isinstance(cat, str) for cat, _ in results)
         assert all(0.0 <= conf <= 1.0 for _, conf in results)
-    
+
+    def test_batch_prediction_matches_single_predictions(self):
+        """Test predict_batch returns the model's own answers, as plain floats, like predict"""
+        categorizer = MLCategorizer()
+        training_data = self._generate_sample_training_data()
+        categorizer.train(training_data, use_cross_validation=False)
+
+        test_txns = [
+            {'merchant_canonical': 'Swiggy', 'description': 'food'},
+            {'merchant_canonical': 'Netflix', 'description': 'streaming'},
+            {'merchant_canonical': 'Corner Shop', 'description': 'misc'},
+        ]
+
+        results = categorizer.predict_batch(test_txns)
+
+        assert results == [categorizer.predict(txn) for txn in test_txns]
+        assert all(type(conf) is float for _, conf in results)
+
     def test_model_persistence(self):
         """Test model can be saved and loaded"""
         # Create and train model
@@ -2,7 +2,7 @@
 Utility modules for Runway Finance
 """
 
-from . import date_parser
+from . import date_parser, ids
 
-__all__ = ['date_parser']
+__all__ = ['date_parser', 'ids']
 